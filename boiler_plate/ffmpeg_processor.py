@@ -7,15 +7,67 @@ Leverages NVIDIA NVENC hardware acceleration when available
 
 import os
 import sys
+import asyncio
+import atexit
 import json
 import subprocess
 import logging
 import re
+import shutil
+import tempfile
+import time
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, asdict
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+def format_json(data: Any) -> str:
+    """Pretty-print JSON for display"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+# Source codecs that NVDEC can decode, mapped to their CUVID decoder names
+CUVID_DECODERS = {
+    'h264': 'h264_cuvid',
+    'hevc': 'hevc_cuvid',
+    'h265': 'hevc_cuvid',
+    'vp9': 'vp9_cuvid',
+    'av1': 'av1_cuvid',
+    'mpeg2video': 'mpeg2_cuvid',
+}
+
+# ffprobe fields consumed by probe_media
+PROBE_ENTRIES = ('format=duration,size,format_name'
+                 ':stream=codec_type,codec_name,bit_rate,width,height,r_frame_rate')
+
+# Machine-readable progress on stdout, errors only on stderr
+PROGRESS_ARGS = ['-progress', 'pipe:1', '-nostats', '-loglevel', 'error']
+
+# Fields read from the -progress records, matched on raw bytes
+PROGRESS_TIME_RE = re.compile(rb'out_time_ms=(\d+)')
+PROGRESS_FPS_RE = re.compile(rb'fps=(\d+(?:\.\d+)?)')
+
+# Minimum seconds between progress line redraws
+PROGRESS_INTERVAL = 0.25
+
+# Concurrent NVENC sessions allowed by GeForce drivers, newest driver first
+GEFORCE_NVENC_LIMITS = ((550, 8), (530, 5), (0, 3))
+
+# Assumed session limit when the GPU cannot be identified
+NVENC_SESSION_LIMIT = 3
+
+# Location of persisted probe results
+CACHE_DIR = Path.home() / '.cache' / 'media_processor'
+
 class ProcessingMode(Enum):
     COMPRESS = "compress"
     CONVERT = "convert"
@@ -25,7 +77,7 @@ class ProcessingMode(Enum):
     THUMBNAIL = "thumbnail"
     METADATA = "metadata"
 
-@dataclass
+@dataclass(slots=True)
 class MediaInfo:
     """Container for media file information"""
     filepath: str
@@ -47,11 +99,26 @@ class MediaProcessor:
     def __init__(self, use_gpu: bool = True):
         self.use_gpu = use_gpu
         self.supported_formats = {
-            'video': ['.mp4', '.avi', '.mkv', '.mov', '.webm', '.flv', '.wmv', '.m4v'],
-            'audio': ['.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma']
+            'video': frozenset({'.mp4', '.avi', '.mkv', '.mov', '.webm', '.flv', '.wmv', '.m4v'}),
+            'audio': frozenset({'.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma'})
         }
+        self.probe_cache_path = CACHE_DIR / 'probe.json'
+        self.caps_cache_path = CACHE_DIR / 'ffmpeg_caps.json'
+        self._probe_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._probe_cache_dirty = False
+        self._deferred_jobs: Optional[List[Tuple[List[str], str, Optional[float]]]] = None
         self.setup_logging()
         self.check_ffmpeg()
+        # New probe results are written once, not on every cache miss
+        atexit.register(self.save_probe_cache)
+        
+        # Newest NVENC codec gives the smallest output at equal quality
+        if self.has_av1_nvenc:
+            self.best_nvenc = 'av1_nvenc'
+        elif self.has_hevc_nvenc:
+            self.best_nvenc = 'hevc_nvenc'
+        else:
+            self.best_nvenc = 'h264_nvenc'
         
     def setup_logging(self):
         """Setup logging configuration"""
@@ -67,88 +134,252 @@ class MediaProcessor:
         
     def check_ffmpeg(self):
         """Verify FFmpeg and hardware acceleration availability"""
-        try:
-            # Check FFmpeg availability
-            result = subprocess.run(['ffmpeg', '-version'], 
-                                  capture_output=True, text=True, check=True)
-            self.logger.info("FFmpeg found and operational")
-            
-            # Check for NVIDIA encoders
-            encoders_result = subprocess.run(['ffmpeg', '-encoders'], 
-                                           capture_output=True, text=True, check=True)
-            
-            self.has_nvenc = 'h264_nvenc' in encoders_result.stdout
-            self.has_av1_nvenc = 'av1_nvenc' in encoders_result.stdout
-            self.has_hevc_nvenc = 'hevc_nvenc' in encoders_result.stdout
-            
-            if self.has_nvenc:
-                self.logger.info("NVIDIA NVENC encoders detected")
-            
-        except subprocess.CalledProcessError:
-            self.logger.error("FFmpeg not found or not working properly")
-            sys.exit(1)
-        except FileNotFoundError:
+        # Resolve both binaries once so no later spawn searches $PATH
+        self.ffmpeg = shutil.which('ffmpeg')
+        self.ffprobe = shutil.which('ffprobe')
+        if self.ffmpeg is None or self.ffprobe is None:
             self.logger.error("FFmpeg not installed or not in PATH")
             sys.exit(1)
+        
+        # Capabilities only change when the ffmpeg binary itself changes
+        st = os.stat(self.ffmpeg)
+        cache_key = [self.ffmpeg, st.st_mtime_ns, st.st_size]
+        caps = self.load_ffmpeg_caps(cache_key)
+        
+        if caps is None:
+            try:
+                caps = self.probe_ffmpeg_caps()
+            except subprocess.CalledProcessError:
+                self.logger.error("FFmpeg not found or not working properly")
+                sys.exit(1)
+            self.save_ffmpeg_caps(cache_key, caps)
+        
+        self.logger.info("FFmpeg found and operational")
+        
+        self.has_nvenc = caps['has_nvenc']
+        self.has_av1_nvenc = caps['has_av1_nvenc']
+        self.has_hevc_nvenc = caps['has_hevc_nvenc']
+        self.cuvid_codecs = set(caps['cuvid_codecs'])
+        self.cuvid_map = {codec: CUVID_DECODERS[codec] for codec in self.cuvid_codecs}
+        
+        if self.has_nvenc:
+            self.logger.info("NVIDIA NVENC encoders detected")
+        
+        if self.cuvid_codecs:
+            self.logger.info(f"NVIDIA CUVID decoders detected: {', '.join(sorted(self.cuvid_codecs))}")
+        
+        self.max_concurrent_nvenc = self.check_nvenc_sessions() if self.has_nvenc else None
+    
+    def probe_ffmpeg_caps(self) -> Dict[str, Any]:
+        """Query the ffmpeg binary for NVIDIA encoders and decoders"""
+        # Check FFmpeg availability
+        subprocess.run([self.ffmpeg, '-version'], capture_output=True, text=True,
+                       check=True, close_fds=False)
+        
+        # Check for NVIDIA encoders
+        encoders_result = subprocess.run([self.ffmpeg, '-encoders'], capture_output=True,
+                                         text=True, check=True, close_fds=False)
+        
+        # Check for NVIDIA CUVID decoders
+        decoders_result = subprocess.run([self.ffmpeg, '-decoders'], capture_output=True,
+                                         text=True, check=True, close_fds=False)
+        
+        return {
+            'has_nvenc': 'h264_nvenc' in encoders_result.stdout,
+            'has_av1_nvenc': 'av1_nvenc' in encoders_result.stdout,
+            'has_hevc_nvenc': 'hevc_nvenc' in encoders_result.stdout,
+            'cuvid_codecs': sorted(
+                codec for codec, decoder in CUVID_DECODERS.items()
+                if decoder in decoders_result.stdout
+            ),
+        }
+    
+    def load_ffmpeg_caps(self, cache_key: List[Any]) -> Optional[Dict[str, Any]]:
+        """Return cached ffmpeg capabilities if the binary is unchanged"""
+        try:
+            with open(self.caps_cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        
+        if cached.get('key') != cache_key:
+            return None
+        return cached.get('caps')
+    
+    def save_ffmpeg_caps(self, cache_key: List[Any], caps: Dict[str, Any]):
+        """Persist ffmpeg capabilities for later runs"""
+        try:
+            self.caps_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.caps_cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': cache_key, 'caps': caps}, f)
+            os.replace(tmp_path, self.caps_cache_path)
+        except OSError as e:
+            self.logger.warning(f"Could not write ffmpeg capability cache: {e}")
+    
+    def check_nvenc_sessions(self) -> Optional[int]:
+        """Work out how many NVENC sessions can be opened concurrently
+        
+        Returns None when the driver does not cap sessions (Quadro, Tesla
+        and data center GPUs). NVENC_SESSIONS overrides the detection for
+        patched drivers.
+        """
+        override = os.environ.get('NVENC_SESSIONS')
+        if override:
+            try:
+                return max(int(override), 1)
+            except ValueError:
+                self.logger.warning(f"Ignoring invalid NVENC_SESSIONS value: {override}")
+        
+        try:
+            result = subprocess.run(
+                ['nvidia-smi', '--query-gpu=name,driver_version,encoder.stats.sessionCount',
+                 '--format=csv,noheader,nounits'],
+                capture_output=True, text=True, check=True, timeout=5
+            )
+            name, driver_version, busy = (
+                value.strip() for value in result.stdout.splitlines()[0].split(',')
+            )
+            driver_major = int(driver_version.split('.')[0])
+            busy = int(busy)
+        except (FileNotFoundError, subprocess.CalledProcessError,
+                subprocess.TimeoutExpired, IndexError, ValueError):
+            return NVENC_SESSION_LIMIT
+        
+        # Only consumer cards are capped by the driver
+        if 'geforce' not in name.lower() and 'titan' not in name.lower():
+            self.logger.info(f"{name} has no NVENC session limit")
+            return None
+        
+        limit = next(limit for min_driver, limit in GEFORCE_NVENC_LIMITS
+                     if driver_major >= min_driver)
+        self.logger.info(f"{name} (driver {driver_version}) allows {limit} NVENC sessions, {busy} in use")
+        return max(limit - busy, 1)
+    
+    def load_probe_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load persisted ffprobe results on first use"""
+        if self._probe_cache is None:
+            try:
+                with open(self.probe_cache_path, 'r', encoding='utf-8') as f:
+                    self._probe_cache = json.load(f)
+            except FileNotFoundError:
+                self._probe_cache = {}
+            except (OSError, json.JSONDecodeError) as e:
+                self.logger.warning(f"Ignoring unreadable probe cache: {e}")
+                self._probe_cache = {}
+        return self._probe_cache
+    
+    def save_probe_cache(self):
+        """Persist ffprobe results so unchanged files are not probed again"""
+        if not self._probe_cache_dirty:
+            return
+        try:
+            self.probe_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.probe_cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._probe_cache, f)
+            os.replace(tmp_path, self.probe_cache_path)
+            self._probe_cache_dirty = False
+        except OSError as e:
+            self.logger.warning(f"Could not write probe cache: {e}")
     
     def analyze_media(self, filepath: str) -> MediaInfo:
-        """Analyze media file and extract comprehensive information"""
+        """Analyze media file, reusing cached results for unchanged files"""
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"File not found: {filepath}")
         
+        # Cache entries are invalidated by any change in mtime or size
+        st = os.stat(filepath)
+        key = os.path.abspath(filepath)
+        cache = self.load_probe_cache()
+        entry = cache.get(key)
+        
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            info = dict(entry['info'], filepath=filepath)
+            # Entries written before MediaInfo dropped the raw probe document
+            info.pop('raw', None)
+            if info['resolution'] is not None:
+                info['resolution'] = tuple(info['resolution'])
+            return MediaInfo(**info)
+        
+        media_info = self.probe_media(filepath)
+        cache[key] = {
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'info': asdict(media_info),
+        }
+        self._probe_cache_dirty = True
+        return media_info
+    
+    def probe_media(self, filepath: str) -> MediaInfo:
+        """Run ffprobe on a media file and extract comprehensive information"""
+        # Only request the fields MediaInfo uses instead of every tag and side data
         cmd = [
-            'ffprobe', '-v', 'quiet', '-print_format', 'json',
-            '-show_format', '-show_streams', filepath
+            self.ffprobe, '-v', 'quiet', '-threads', '0', '-print_format', 'json',
+            '-show_entries', PROBE_ENTRIES, filepath
         ]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            data = json.loads(result.stdout)
+            # Both orjson and json parse the raw bytes without a separate decode
+            result = subprocess.run(cmd, capture_output=True, check=True, close_fds=False)
+            data = json_loads(result.stdout)
             
             # Extract basic info
             format_info = data.get('format', {})
             streams = data.get('streams', [])
             
+            # Only the first stream of each type describes the file
+            video = next((stream for stream in streams if stream.get('codec_type') == 'video'), None)
+            audio = next((stream for stream in streams if stream.get('codec_type') == 'audio'), None)
+            
             media_info = MediaInfo(
                 filepath=filepath,
                 duration=float(format_info.get('duration', 0)),
                 size_mb=float(format_info.get('size', 0)) / (1024 * 1024),
-                format_name=format_info.get('format_name', 'unknown')
+                format_name=format_info.get('format_name', 'unknown'),
+                has_video=video is not None,
+                has_audio=audio is not None
             )
             
-            # Analyze streams
-            for stream in streams:
-                codec_type = stream.get('codec_type')
+            if video is not None:
+                video_bitrate = video.get('bit_rate')
+                media_info.video_codec = video.get('codec_name')
+                media_info.video_bitrate = int(video_bitrate) if video_bitrate else None
+                media_info.resolution = (int(video.get('width', 0)), int(video.get('height', 0)))
                 
-                if codec_type == 'video':
-                    media_info.has_video = True
-                    media_info.video_codec = stream.get('codec_name')
-                    media_info.video_bitrate = int(stream.get('bit_rate', 0)) if stream.get('bit_rate') else None
-                    media_info.resolution = (
-                        int(stream.get('width', 0)),
-                        int(stream.get('height', 0))
-                    )
-                    
-                    # Calculate FPS
-                    fps_str = stream.get('r_frame_rate', '0/1')
-                    if '/' in fps_str:
-                        num, den = map(int, fps_str.split('/'))
-                        media_info.fps = num / den if den != 0 else 0
-                
-                elif codec_type == 'audio':
-                    media_info.has_audio = True
-                    media_info.audio_codec = stream.get('codec_name')
-                    media_info.audio_bitrate = int(stream.get('bit_rate', 0)) if stream.get('bit_rate') else None
+                # Calculate FPS
+                num, sep, den = video.get('r_frame_rate', '0/1').partition('/')
+                if sep:
+                    media_info.fps = int(num) / int(den) if den != '0' else 0.0
+            
+            if audio is not None:
+                audio_bitrate = audio.get('bit_rate')
+                media_info.audio_codec = audio.get('codec_name')
+                media_info.audio_bitrate = int(audio_bitrate) if audio_bitrate else None
             
             return media_info
             
         except subprocess.CalledProcessError as e:
-            self.logger.error(f"Failed to analyze {filepath}: {e}")
+            stderr = e.stderr.decode(errors='replace').strip() if e.stderr else ''
+            self.logger.error(f"Failed to analyze {filepath}: {e} {stderr}".rstrip())
             raise
         except json.JSONDecodeError as e:
             self.logger.error(f"Failed to parse ffprobe output: {e}")
             raise
     
+    def probe_full(self, filepath: str) -> Dict[str, Any]:
+        """Run ffprobe for every format and stream field, for display
+        
+        probe_media only requests what MediaInfo needs, so the metadata view
+        pays for this full probe on demand.
+        """
+        cmd = [
+            self.ffprobe, '-v', 'quiet', '-print_format', 'json',
+            '-show_format', '-show_streams', filepath
+        ]
+        result = subprocess.run(cmd, capture_output=True, check=True, close_fds=False)
+        return json_loads(result.stdout)
+    
     def print_media_info(self, media_info: MediaInfo):
         """Display comprehensive media information"""
         print("\n" + "="*60)
@@ -178,11 +409,52 @@ class MediaProcessor:
     
     def format_duration(self, seconds: float) -> str:
         """Format duration in human readable format"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
+        minutes, secs = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
     
+    def use_hw_decode(self, media_info: MediaInfo) -> bool:
+        """Check if the source can be decoded on the GPU for an NVENC encode"""
+        return (self.use_gpu and self.has_nvenc
+                and media_info.video_codec in self.cuvid_codecs)
+    
+    def build_input_args(self, media_info: MediaInfo, hw_decode: bool = False,
+                         cuvid: bool = False) -> List[str]:
+        """Build the input side of an FFmpeg command"""
+        cmd = [self.ffmpeg]
+        
+        if hw_decode and cuvid and media_info.video_codec in self.cuvid_map:
+            # Decode with the matching CUVID decoder for a pure GPU transcode
+            cmd.extend(['-vsync', '0', '-hwaccel', 'cuvid', '-hwaccel_output_format', 'cuda',
+                        '-c:v', self.cuvid_map[media_info.video_codec]])
+        elif hw_decode:
+            # Decode with NVDEC and keep frames in VRAM for the NVENC encoder
+            cmd.extend(['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda'])
+        
+        cmd.extend(['-i', media_info.filepath])
+        return cmd
+    
+    def build_cpu_thread_args(self, video_codec: Optional[str] = None) -> List[str]:
+        """Build threading options for CPU encoders and their filter graphs"""
+        filter_threads = str(os.cpu_count() or 1)
+        args = ['-threads', '0', '-filter_threads', filter_threads,
+                '-filter_complex_threads', filter_threads]
+        
+        if video_codec == 'libx264':
+            # Frame threading gives better quality per second than slice threading
+            args.extend(['-x264-params', 'threads=0:sliced-threads=0'])
+        
+        return args
+    
+    def build_scale_filter(self, scale: str, hw_decode: bool, nvenc: bool) -> str:
+        """Build a scale filter that stays on the GPU whenever NVENC encodes"""
+        if hw_decode:
+            return f'scale_cuda={scale}:format=yuv420p'
+        if nvenc:
+            # CPU-decoded frames are uploaded once and scaled on the GPU
+            return f'hwupload_cuda,scale_cuda={scale}:format=yuv420p'
+        return f'scale={scale}'
+    
     def get_processing_options(self, media_info: MediaInfo) -> Dict[str, str]:
         """Generate processing options based on media analysis"""
         options = {}
@@ -231,12 +503,7 @@ class MediaProcessor:
         
         # Determine encoder and settings
         if self.use_gpu and self.has_nvenc:
-            if media_info.video_codec == 'h264':
-                encoder = 'h264_nvenc'
-            elif media_info.video_codec in ['hevc', 'h265']:
-                encoder = 'hevc_nvenc' if self.has_hevc_nvenc else 'h264_nvenc'
-            else:
-                encoder = 'h264_nvenc'
+            encoder = self.best_nvenc
         else:
             encoder = 'libx264'
         
@@ -249,12 +516,15 @@ class MediaProcessor:
         
         settings = presets.get(compression_level, presets['medium'])
         
-        cmd = ['ffmpeg', '-i', media_info.filepath, '-c:v', encoder]
+        hw_decode = encoder.endswith('_nvenc') and self.use_hw_decode(media_info)
+        cmd = self.build_input_args(media_info, hw_decode, cuvid=True)
+        cmd.extend(['-c:v', encoder])
         
-        if encoder.startswith('h264_nvenc') or encoder.startswith('hevc_nvenc'):
-            cmd.extend(['-preset', 'fast', '-cq', settings['crf']])
+        if encoder.endswith('_nvenc'):
+            cmd.extend(['-preset', 'p4', '-tune', 'hq', '-rc', 'vbr', '-cq', settings['crf']])
         else:
             cmd.extend(['-crf', settings['crf'], '-preset', settings['preset']])
+            cmd.extend(self.build_cpu_thread_args(encoder))
         
         # Audio settings
         if media_info.has_audio:
@@ -262,16 +532,17 @@ class MediaProcessor:
         
         cmd.extend(['-y', output_path])
         
-        return self.run_ffmpeg_command(cmd, "Compressing video")
+        return self.run_ffmpeg_command(cmd, "Compressing video", media_info.duration)
     
     def get_format_options(self, media_info: MediaInfo) -> Dict[str, Dict[str, str]]:
         """Get available format conversion options"""
         if media_info.has_video:
+            nvenc_codec = self.best_nvenc if (self.use_gpu and self.has_nvenc) else 'libx264'
             return {
-                'mp4': {'container': 'mp4', 'video_codec': 'h264_nvenc' if (self.use_gpu and self.has_nvenc) else 'libx264', 'audio_codec': 'aac'},
+                'mp4': {'container': 'mp4', 'video_codec': nvenc_codec, 'audio_codec': 'aac'},
                 'webm': {'container': 'webm', 'video_codec': 'libvpx-vp9', 'audio_codec': 'libopus'},
                 'avi': {'container': 'avi', 'video_codec': 'libx264', 'audio_codec': 'aac'},
-                'mkv': {'container': 'mkv', 'video_codec': 'h264_nvenc' if (self.use_gpu and self.has_nvenc) else 'libx264', 'audio_codec': 'aac'},
+                'mkv': {'container': 'mkv', 'video_codec': nvenc_codec, 'audio_codec': 'aac'},
                 'mov': {'container': 'mov', 'video_codec': 'libx264', 'audio_codec': 'aac'},
             }
         else:
@@ -294,7 +565,12 @@ class MediaProcessor:
             return False
         
         format_config = format_options[target_format.lower()]
-        cmd = ['ffmpeg', '-i', media_info.filepath]
+        
+        # Frames only stay on the GPU when the target encoder is NVENC
+        hw_decode = (media_info.has_video
+                     and format_config['video_codec'].endswith('_nvenc')
+                     and self.use_hw_decode(media_info))
+        cmd = self.build_input_args(media_info, hw_decode, cuvid=True)
         
         if media_info.has_video:
             # Video codec
@@ -303,12 +579,15 @@ class MediaProcessor:
             
             # Add NVENC specific settings
             if video_codec.endswith('_nvenc'):
-                cmd.extend(['-preset', 'fast'])
+                cmd.extend(['-preset', 'p4'])
             elif video_codec == 'libx264':
                 cmd.extend(['-preset', 'fast', '-crf', '23'])
             elif video_codec == 'libvpx-vp9':
                 cmd.extend(['-crf', '30', '-b:v', '0'])
             
+            if not video_codec.endswith('_nvenc'):
+                cmd.extend(self.build_cpu_thread_args(video_codec))
+            
             # Audio codec (if audio present)
             if media_info.has_audio and 'audio_codec' in format_config:
                 audio_codec = format_config['audio_codec']
@@ -327,10 +606,13 @@ class MediaProcessor:
             # Add bitrate for lossy formats
             if 'bitrate' in format_config:
                 cmd.extend(['-b:a', format_config['bitrate']])
+            
+            cmd.extend(self.build_cpu_thread_args())
         
         cmd.extend(['-y', output_path])
         
-        return self.run_ffmpeg_command(cmd, f"Converting to {target_format.upper()}")
+        return self.run_ffmpeg_command(cmd, f"Converting to {target_format.upper()}",
+                                       media_info.duration)
     
     def extract_audio(self, media_info: MediaInfo, output_path: str, 
                      format: str = 'mp3', bitrate: str = '192k') -> bool:
@@ -341,17 +623,24 @@ class MediaProcessor:
             return False
         
         cmd = [
-            'ffmpeg', '-i', media_info.filepath,
+            self.ffmpeg, '-i', media_info.filepath,
             '-vn',  # No video
             '-c:a', 'mp3' if format == 'mp3' else 'aac',
-            '-b:a', bitrate,
-            '-y', output_path
+            '-b:a', bitrate
         ]
+        cmd.extend(self.build_cpu_thread_args())
+        cmd.extend(['-y', output_path])
         
-        return self.run_ffmpeg_command(cmd, "Extracting audio")
+        return self.run_ffmpeg_command(cmd, "Extracting audio", media_info.duration)
     
-    def optimize_for_streaming(self, media_info: MediaInfo, output_path: str) -> bool:
-        """Optimize video for web streaming"""
+    def optimize_for_streaming(self, media_info: MediaInfo, output_path: str,
+                               fragmented: bool = True) -> bool:
+        """Optimize video for web streaming
+        
+        Fragmented MP4 is streamable as written, so it skips the second pass
+        that +faststart needs to move the moov atom. Pass fragmented=False
+        for players that only accept regular MP4.
+        """
         
         if not media_info.has_video:
             self.logger.error("Cannot optimize audio-only file for streaming")
@@ -367,15 +656,28 @@ class MediaProcessor:
         else:
             target_res = f"{width}:{height}"
         
-        cmd = ['ffmpeg', '-i', media_info.filepath]
+        hw_decode = self.use_hw_decode(media_info)
+        cmd = self.build_input_args(media_info, hw_decode)
+        
+        output_fps = 30
         
         if self.use_gpu and self.has_nvenc:
+            # Low-latency CBR with a 2 second GOP and no B-frames
             cmd.extend([
                 '-c:v', 'h264_nvenc',
-                '-preset', 'fast',
+                '-preset', 'p4',
+                '-tune', 'll',
                 '-profile:v', 'main',
                 '-level', '4.0',
-                '-cq', '25'
+                '-rc', 'cbr',
+                '-b:v', '5M',
+                '-maxrate', '5M',
+                '-bufsize', '10M',
+                '-g', str(output_fps * 2),
+                '-bf', '0',
+                '-rc-lookahead', '20',
+                '-spatial-aq', '1',
+                '-temporal-aq', '1'
             ])
         else:
             cmd.extend([
@@ -385,17 +687,23 @@ class MediaProcessor:
                 '-level', '4.0',
                 '-crf', '25'
             ])
+            cmd.extend(self.build_cpu_thread_args('libx264'))
+        
+        if fragmented:
+            movflags = '+frag_keyframe+empty_moov+default_base_moof'
+        else:
+            movflags = '+faststart'
         
         cmd.extend([
-            '-vf', f'scale={target_res}',
-            '-r', '30',  # 30 FPS max
-            '-movflags', '+faststart',  # Web optimization
+            '-vf', self.build_scale_filter(target_res, hw_decode, self.use_gpu and self.has_nvenc),
+            '-r', str(output_fps),  # 30 FPS max
+            '-movflags', movflags,  # Web optimization
             '-c:a', 'aac',
             '-b:a', '128k',
             '-y', output_path
         ])
         
-        return self.run_ffmpeg_command(cmd, "Optimizing for streaming")
+        return self.run_ffmpeg_command(cmd, "Optimizing for streaming", media_info.duration)
     
     def reduce_quality(self, media_info: MediaInfo, output_path: str,
                       quality_level: str = "medium") -> bool:
@@ -409,23 +717,30 @@ class MediaProcessor:
         
         settings = quality_settings.get(quality_level, quality_settings['medium'])
         
-        cmd = ['ffmpeg', '-i', media_info.filepath]
+        hw_decode = media_info.has_video and self.use_hw_decode(media_info)
+        cmd = self.build_input_args(media_info, hw_decode)
         
         if media_info.has_video:
             if self.use_gpu and self.has_nvenc:
                 cmd.extend(['-c:v', 'h264_nvenc', '-cq', settings['video_crf']])
             else:
                 cmd.extend(['-c:v', 'libx264', '-crf', settings['video_crf']])
+                cmd.extend(self.build_cpu_thread_args('libx264'))
             
             if settings['scale']:
-                cmd.extend(['-vf', f'scale={settings["scale"]}'])
+                scale_filter = self.build_scale_filter(settings['scale'], hw_decode,
+                                                       self.use_gpu and self.has_nvenc)
+                cmd.extend(['-vf', scale_filter])
         
         if media_info.has_audio:
             cmd.extend(['-c:a', 'aac', '-b:a', settings['audio_bitrate']])
+            if not media_info.has_video:
+                cmd.extend(self.build_cpu_thread_args())
         
         cmd.extend(['-y', output_path])
         
-        return self.run_ffmpeg_command(cmd, f"Reducing quality ({quality_level})")
+        return self.run_ffmpeg_command(cmd, f"Reducing quality ({quality_level})",
+                                       media_info.duration)
     
     def generate_thumbnail(self, media_info: MediaInfo, output_path: str,
                           timestamp: str = "00:00:05") -> bool:
@@ -435,13 +750,20 @@ class MediaProcessor:
             self.logger.error("Cannot generate thumbnail from audio-only file")
             return False
         
-        cmd = [
-            'ffmpeg', '-i', media_info.filepath,
-            '-ss', timestamp,
-            '-vframes', '1',
+        # Input-side seek jumps to the nearest keyframe instead of decoding up to it
+        cmd = [self.ffmpeg, '-ss', timestamp, '-noaccurate_seek']
+        
+        if self.use_hw_decode(media_info):
+            # Frames are downloaded automatically for the CPU scale filter
+            cmd.extend(['-hwaccel', 'cuda'])
+        
+        cmd.extend([
+            '-i', media_info.filepath,
+            '-frames:v', '1',
             '-vf', 'scale=320:240',
+            '-q:v', '3',
             '-y', output_path
-        ]
+        ])
         
         return self.run_ffmpeg_command(cmd, "Generating thumbnail")
     
@@ -454,21 +776,20 @@ class MediaProcessor:
         
         current_ext = Path(media_info.filepath).suffix.lower().lstrip('.')
         
-        formats_list = list(format_options.keys())
-        for i, fmt in enumerate(formats_list, 1):
+        formats_list = tuple(format_options)
+        for i, (fmt, config) in enumerate(format_options.items(), 1):
             current_indicator = " (current)" if fmt == current_ext else ""
-            description = ""
             
             if media_info.has_video:
-                video_codec = format_options[fmt]['video_codec']
-                audio_codec = format_options[fmt].get('audio_codec', 'none')
-                if video_codec.endswith('_nvenc'):
+                video_codec = config['video_codec']
+                is_gpu = video_codec.endswith('_nvenc')
+                if is_gpu:
                     description = f" - GPU accelerated ({video_codec})"
                 else:
                     description = f" - {video_codec.upper()}"
             else:
-                audio_codec = format_options[fmt]['audio_codec']
-                bitrate = format_options[fmt].get('bitrate', 'lossless')
+                audio_codec = config['audio_codec']
+                bitrate = config.get('bitrate', 'lossless')
                 description = f" - {audio_codec.upper()} ({bitrate})"
             
             print(f"{i}. {fmt.upper()}{current_indicator}{description}")
@@ -488,39 +809,86 @@ class MediaProcessor:
             print("❌ Invalid input")
             return None
     
-    def run_ffmpeg_command(self, cmd: List[str], operation: str) -> bool:
+    def run_ffmpeg_command(self, cmd: List[str], operation: str,
+                           duration: Optional[float] = None) -> bool:
         """Execute FFmpeg command with progress monitoring"""
         
+        # Inside collect_commands the command is queued instead of executed
+        if self._deferred_jobs is not None:
+            self._deferred_jobs.append((cmd, operation, duration))
+            return True
+        
+        return asyncio.run(self.run_ffmpeg_async(cmd, operation, duration))
+    
+    async def run_ffmpeg_async(self, cmd: List[str], operation: str,
+                               duration: Optional[float] = None,
+                               show_progress: bool = True) -> bool:
+        """Execute FFmpeg command and monitor it from the event loop"""
+        
+        cmd = cmd[:1] + PROGRESS_ARGS + cmd[1:]
+        
         self.logger.info(f"Starting: {operation}")
         self.logger.info(f"Command: {' '.join(cmd)}")
         
         try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
+            # An absolute path with close_fds=False lets CPython use posix_spawn
+            # instead of forking the whole interpreter
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=1 << 20,
+                close_fds=False
             )
             
-            # Monitor progress
-            while True:
-                output = process.stderr.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    # Extract progress info from FFmpeg output
-                    if 'time=' in output:
-                        print(f"\r⚡ {operation}... {output.strip()}", end='', flush=True)
+            # Drain stderr concurrently so ffmpeg never blocks on a full pipe
+            stderr_tail = deque(maxlen=200)
+            
+            async def drain_stderr():
+                async for raw in process.stderr:
+                    stderr_tail.append(raw.decode(errors='replace'))
+            
+            stderr_task = asyncio.create_task(drain_stderr())
+            
+            # Monitor progress from the key=value records on stdout
+            out_time = 0.0
+            last_print = 0.0
+            fps = None
+            async for raw in process.stdout:
+                match = PROGRESS_TIME_RE.match(raw)
+                if match:
+                    out_time = int(match.group(1)) / 1_000_000
+                    continue
+                
+                match = PROGRESS_FPS_RE.match(raw)
+                if match:
+                    fps = match.group(1).decode()
+                elif show_progress and raw.startswith(b'progress='):
+                    now = time.monotonic()
+                    if now - last_print < PROGRESS_INTERVAL and raw != b'progress=end\n':
+                        continue
+                    last_print = now
+                    status = self.format_duration(out_time)
+                    if duration:
+                        status += f" ({min(out_time / duration, 1.0):.0%})"
+                    if fps:
+                        status += f" @ {fps} fps"
+                    print(f"\r⚡ {operation}... {status}", end='', flush=True)
             
-            process.wait()
+            await process.wait()
+            await stderr_task
+            
+            # Finish the progress line before printing the result
+            if show_progress:
+                print()
             
             if process.returncode == 0:
-                print(f"\n✅ {operation} completed successfully!")
+                print(f"✅ {operation} completed successfully!")
                 return True
             else:
-                error_output = process.stderr.read()
+                error_output = ''.join(stderr_tail)
                 self.logger.error(f"FFmpeg error: {error_output}")
-                print(f"\n❌ {operation} failed!")
+                print(f"❌ {operation} failed!")
                 return False
                 
         except Exception as e:
@@ -528,6 +896,165 @@ class MediaProcessor:
             print(f"\n❌ {operation} failed: {e}")
             return False
     
+    def collect_commands(self, op_callable: Callable[..., bool], media_info: MediaInfo,
+                         output_path: str, **op_kwargs) -> List[Tuple[List[str], str, Optional[float]]]:
+        """Build the FFmpeg jobs an operation would run without executing them"""
+        self._deferred_jobs = []
+        try:
+            op_callable(self, media_info, output_path, **op_kwargs)
+            return self._deferred_jobs
+        finally:
+            self._deferred_jobs = None
+    
+    def batch_process(self, files: List[str], op_callable: Callable[..., bool],
+                      output_suffix: str, max_workers: Optional[int] = None,
+                      **op_kwargs) -> Dict[str, bool]:
+        """Run one processing operation over many files concurrently
+        
+        op_callable is an unbound MediaProcessor method such as
+        MediaProcessor.compress_video. Each output is written next to its
+        input as <stem><output_suffix>.
+        """
+        if not files:
+            return {}
+        
+        results = {}
+        jobs = []
+        for filepath in files:
+            path = Path(filepath)
+            output_path = str(path.parent / f"{path.stem}{output_suffix}")
+            try:
+                media_info = self.analyze_media(filepath)
+                file_jobs = self.collect_commands(op_callable, media_info, output_path, **op_kwargs)
+            except Exception as e:
+                self.logger.error(f"Failed to prepare {filepath}: {e}")
+                file_jobs = []
+            
+            # Operations that reject a file queue no command
+            results[filepath] = bool(file_jobs)
+            jobs.extend((filepath, job) for job in file_jobs)
+        self.save_probe_cache()
+        
+        cpu_workers = max((os.cpu_count() or 2) // 2, 1)
+        uses_nvenc = any(arg.endswith('_nvenc') for _, (cmd, _, _) in jobs for arg in cmd)
+        if uses_nvenc:
+            # Never open more encoder sessions than the driver allows
+            nvenc_limit = self.max_concurrent_nvenc
+            if max_workers is None:
+                max_workers = nvenc_limit or cpu_workers
+            elif nvenc_limit is not None:
+                max_workers = min(max_workers, nvenc_limit)
+        elif max_workers is None:
+            max_workers = cpu_workers
+        max_workers = max(min(len(jobs), max_workers), 1)
+        
+        self.logger.info(f"Processing {len(jobs)} files with {max_workers} concurrent jobs")
+        
+        async def run_all():
+            semaphore = asyncio.Semaphore(max_workers)
+            
+            async def run_job(filepath, job):
+                cmd, operation, duration = job
+                async with semaphore:
+                    return await self.run_ffmpeg_async(
+                        cmd, f"{Path(filepath).name}: {operation}", duration,
+                        show_progress=max_workers == 1
+                    )
+            
+            return await asyncio.gather(*(run_job(filepath, job) for filepath, job in jobs))
+        
+        for (filepath, _), success in zip(jobs, asyncio.run(run_all())):
+            results[filepath] = results[filepath] and success
+        
+        return results
+    
+    def batch_convert_same_format(self, files: List[str], target_format: str) -> Dict[str, bool]:
+        """Convert many matching files with a single long-lived FFmpeg process
+        
+        The concat demuxer feeds every input through one decoder/encoder
+        session and the segment muxer splits the output back at the file
+        boundaries, so codec initialisation is paid once instead of per file.
+        Outputs are written next to each input as <stem>_converted.<format>.
+        """
+        if not files:
+            return {}
+        
+        target_format = target_format.lower()
+        media_infos = [self.analyze_media(filepath) for filepath in files]
+        self.save_probe_cache()
+        output_paths = [
+            str(Path(filepath).parent / f"{Path(filepath).stem}_converted.{target_format}")
+            for filepath in files
+        ]
+        
+        # The concat demuxer requires identical stream layouts
+        def stream_layout(media_info: MediaInfo):
+            return (media_info.has_video, media_info.has_audio, media_info.video_codec,
+                    media_info.audio_codec, media_info.resolution, media_info.fps)
+        
+        first = media_infos[0]
+        if len(files) == 1 or any(stream_layout(mi) != stream_layout(first) for mi in media_infos[1:]):
+            self.logger.info("Inputs do not share a stream layout, converting one by one")
+            return {
+                filepath: self.convert_format(media_info, output_path, target_format)
+                for filepath, media_info, output_path in zip(files, media_infos, output_paths)
+            }
+        
+        # Reuse the single-file command and swap its input and output sides
+        jobs = self.collect_commands(MediaProcessor.convert_format, first, output_paths[0],
+                                     target_format=target_format)
+        if not jobs:
+            return {filepath: False for filepath in files}
+        cmd, _, _ = jobs[0]
+        input_index = cmd.index('-i')
+        
+        work_dir = tempfile.mkdtemp(prefix='.batch_', dir=Path(output_paths[0]).parent)
+        list_path = os.path.join(work_dir, 'inputs.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for filepath in files:
+                escaped = os.path.abspath(filepath).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        
+        # Split points are the cumulative input durations
+        boundaries = []
+        elapsed = 0.0
+        for media_info in media_infos[:-1]:
+            elapsed += media_info.duration
+            boundaries.append(f"{elapsed:.3f}")
+        split_times = ','.join(boundaries)
+        
+        output_args = cmd[input_index + 2:-2]
+        if first.has_video:
+            output_args.extend(['-force_key_frames', split_times])
+            if any(arg.endswith('_nvenc') for arg in output_args):
+                output_args.extend(['-forced-idr', '1'])
+        
+        segment_pattern = os.path.join(work_dir, f"segment_%05d.{target_format}")
+        batch_cmd = (
+            cmd[:input_index]
+            + ['-f', 'concat', '-safe', '0', '-i', list_path]
+            + output_args
+            + ['-f', 'segment', '-segment_times', split_times,
+               '-reset_timestamps', '1', '-y', segment_pattern]
+        )
+        
+        success = self.run_ffmpeg_command(
+            batch_cmd, f"Converting {len(files)} files to {target_format.upper()}",
+            sum(media_info.duration for media_info in media_infos)
+        )
+        
+        results = {}
+        for index, (filepath, output_path) in enumerate(zip(files, output_paths)):
+            segment_path = segment_pattern % index
+            if success and os.path.exists(segment_path):
+                shutil.move(segment_path, output_path)
+                results[filepath] = True
+            else:
+                results[filepath] = False
+        
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return results
+    
     def interactive_menu(self, filepath: str):
         """Interactive menu for media processing"""
         
@@ -537,6 +1064,11 @@ class MediaProcessor:
             media_info = self.analyze_media(filepath)
             self.print_media_info(media_info)
             
+            # Output filenames are derived from the input path
+            path = Path(filepath)
+            base_name = path.stem
+            output_dir = path.parent
+            
             while True:
                 # Generate options based on media analysis
                 options = self.get_processing_options(media_info)
@@ -557,10 +1089,6 @@ class MediaProcessor:
                     print("❌ Invalid option. Please try again.")
                     continue
                 
-                # Generate output filename
-                base_name = Path(filepath).stem
-                output_dir = Path(filepath).parent
-                
                 success = False
                 
                 if choice == '1':  # Compress
@@ -613,12 +1141,13 @@ class MediaProcessor:
                     success = self.generate_thumbnail(media_info, str(output_path), timestamp)
                 
                 elif choice == '7':  # Show metadata
-                    cmd = ['ffprobe', '-v', 'quiet', '-show_format', '-show_streams', filepath]
-                    result = subprocess.run(cmd, capture_output=True, text=True)
                     print("\n📋 Detailed Metadata:")
                     print("-" * 40)
-                    print(result.stdout)
-                    success = True
+                    try:
+                        print(format_json(self.probe_full(media_info.filepath)))
+                        success = True
+                    except (subprocess.CalledProcessError, ValueError) as e:
+                        print(f"❌ Could not read metadata: {e}")
                 
                 if success and choice != '7':
                     print(f"📁 Output saved: {output_path}")
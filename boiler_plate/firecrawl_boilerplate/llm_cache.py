@@ -0,0 +1,167 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+def json_dumps(data: Any) -> bytes:
+    """
+    Serialize JSON to bytes, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+CACHE_DIR = Path.home() / ".cache" / "tasklm" / "llm"
+DEFAULT_TTL = 7 * 86400  # One week
+
+logger = logging.getLogger(__name__)
+
+# Hit/miss counters for this process
+stats = {"hits": 0, "misses": 0}
+
+def record(hit: bool) -> None:
+    """
+    Count one logical lookup as a hit or a miss
+    
+    Callers that chain several lookups (exact, then semantic) pass
+    record=False to each and report the overall outcome once here.
+    """
+    stats["hits" if hit else "misses"] += 1
+
+def make_key(**parts: str) -> str:
+    """
+    Build a stable cache key from the inputs that determine an LLM response
+    
+    Parts are fed to one hash object in name order, each length-prefixed so
+    different splits of the same text cannot collide.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(parts):
+        value = parts[name].encode("utf-8")
+        digest.update(f"{name}|{len(value)}|".encode("utf-8"))
+        digest.update(value)
+    return digest.hexdigest()
+
+def get(key: str, record: bool = True) -> Optional[str]:
+    """
+    Return the cached response for a key, or None if missing or expired
+    """
+    path = CACHE_DIR / f"{key}.json"
+    try:
+        with open(path, "rb") as f:
+            entry = json_loads(f.read())
+    except (OSError, ValueError):
+        entry = None
+
+    value = entry["value"] if entry and entry.get("expires", 0) >= time.time() else None
+    if record:
+        stats["hits" if value is not None else "misses"] += 1
+    return value
+
+def set(key: str, value: str, ttl: int = DEFAULT_TTL) -> None:
+    """
+    Store a response under a key for ttl seconds
+    """
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = CACHE_DIR / f"{key}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(json_dumps({"expires": time.time() + ttl, "value": value}))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.error("Error writing LLM cache: %s", e)
+
+SEMANTIC_INDEX_PATH = CACHE_DIR / "semantic_index.json"
+SEMANTIC_THRESHOLD = 0.92
+SEMANTIC_MAX_ENTRIES = 1000
+
+_semantic_index = None
+_semantic_dirty = False
+
+def _load_semantic_index() -> list:
+    """
+    Load the semantic index once per process
+    """
+    global _semantic_index
+    if _semantic_index is None:
+        try:
+            with open(SEMANTIC_INDEX_PATH, "rb") as f:
+                _semantic_index = json_loads(f.read())
+        except (OSError, ValueError):
+            _semantic_index = []
+    return _semantic_index
+
+def _normalize(vector: list) -> list:
+    norm = sum(x * x for x in vector) ** 0.5
+    return [x / norm for x in vector] if norm else vector
+
+def semantic_get(vector: list, threshold: float = SEMANTIC_THRESHOLD, record: bool = True) -> Optional[str]:
+    """
+    Return the value stored for the most similar vector if its cosine
+    similarity reaches the threshold
+    
+    Hits only reorder the index in memory; the order is written out by
+    the next semantic_set or at exit.
+    """
+    index = _load_semantic_index()
+    query = _normalize(vector)
+
+    best, best_sim = None, threshold
+    for entry in index:
+        sim = sum(a * b for a, b in zip(query, entry["vector"]))
+        if sim >= best_sim:
+            best, best_sim = entry, sim
+
+    if record:
+        stats["hits" if best is not None else "misses"] += 1
+    if best is None:
+        return None
+
+    # Move the hit to the end so eviction drops the least recently used
+    global _semantic_dirty
+    index.remove(best)
+    index.append(best)
+    _semantic_dirty = True
+    return best["value"]
+
+def semantic_set(vector: list, value: str, max_entries: int = SEMANTIC_MAX_ENTRIES) -> None:
+    """
+    Add a vector and its value, evicting the least recently used entries
+    """
+    index = _load_semantic_index()
+    index.append({"vector": _normalize(vector), "value": value})
+    del index[:-max_entries]
+    _save_semantic_index()
+
+def flush() -> None:
+    """
+    Write out recency changes from semantic hits, if there are any
+    """
+    if _semantic_dirty:
+        _save_semantic_index()
+
+atexit.register(flush)
+
+def _save_semantic_index() -> None:
+    global _semantic_dirty
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = SEMANTIC_INDEX_PATH.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(json_dumps(_semantic_index))
+        os.replace(tmp_path, SEMANTIC_INDEX_PATH)
+        _semantic_dirty = False
+    except OSError as e:
+        logger.error("Error writing semantic cache: %s", e)
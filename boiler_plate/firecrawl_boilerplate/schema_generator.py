@@ -1,19 +1,145 @@
 from firecrawl import FirecrawlApp
 from dotenv import load_dotenv
+import asyncio
+import httpx
 import os
 import openai
+import hashlib
 import json
-from typing import Dict, Any
+import keyword
+import logging
+import re
+import sys
+from selectolax.parser import HTMLParser
+from typing import Dict, Any, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+import llm_cache
 
 # Load environment variables
 load_dotenv()
 
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(message)s")
+logger = logging.getLogger(__name__)
+
 # Initialize Firecrawl with API key
 app = FirecrawlApp(api_key=os.getenv("FIRECRAWL_API_KEY"))
 
 # Initialize OpenAI client
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+FIRECRAWL_SCRAPE_URL = "https://api.firecrawl.dev/v1/scrape"
+FIRECRAWL_CONCURRENCY = 20  # Stay under Firecrawl rate limits
+
+SCHEMA_MODEL = "gpt-4o-mini"
+SCHEMA_SYSTEM_PROMPT = "You are a helpful assistant that creates Pydantic schemas for web content extraction."
+EMBEDDING_MODEL = "text-embedding-3-small"
+SKELETON_MAX_CHARS = 1024
+PROMPT_TEXT_CHARS = 1500
+NON_CONTENT_TAGS = ["script", "style", "noscript", "svg"]
+SALIENT_SELECTOR = "h1,h2,h3,section,article,main,table"
+
+# Characters that are unsafe in file names on common platforms
+FILENAME_TABLE = str.maketrans({c: "_" for c in '/\\:?*<>|"'})
+
+FIELD_TYPES = ["str", "int", "float", "bool", "List[str]", "Optional[str]", "Optional[int]", "Optional[float]", "Optional[bool]"]
+
+# Structured-output format: the model returns field definitions, not code
+SCHEMA_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "extraction_schema",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "class_name": {"type": "string"},
+                "fields": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "type": {"type": "string", "enum": FIELD_TYPES},
+                            "description": {"type": "string"}
+                        },
+                        "required": ["name", "type", "description"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["class_name", "fields"],
+            "additionalProperties": False
+        }
+    }
+}
+
+async def get_html_contents_async(urls: List[str]) -> List[Optional[str]]:
+    """
+    Get HTML content for many URLs concurrently over one pooled HTTP/2 client
+    
+    Results are returned in the same order as the input URLs.
+    """
+    semaphore = asyncio.Semaphore(FIRECRAWL_CONCURRENCY)
+    limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    headers = {"Authorization": f"Bearer {os.getenv('FIRECRAWL_API_KEY')}"}
+    
+    async with httpx.AsyncClient(http2=True, limits=limits, headers=headers, timeout=60) as client:
+        async def scrape(url: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    response = await client.post(FIRECRAWL_SCRAPE_URL, json={"url": url, "formats": ["html"]})
+                    response.raise_for_status()
+                    return json_loads(response.content).get("data", {}).get("html")
+                except Exception as e:
+                    logger.error("Error getting HTML content for %s: %s", url, e)
+                    return None
+        
+        return await asyncio.gather(*(scrape(url) for url in urls))
+
+def get_html_contents(urls: List[str]) -> List[Optional[str]]:
+    """
+    Synchronous wrapper around get_html_contents_async
+    """
+    return asyncio.run(get_html_contents_async(urls))
+
+def html_skeleton(html_content: str) -> str:
+    """
+    Reduce HTML to a short tag-only fingerprint of its structure
+    """
+    tree = HTMLParser(html_content)
+    tree.strip_tags(NON_CONTENT_TAGS + ["meta", "link"])
+    tags = [node.tag for node in tree.root.traverse()] if tree.root else []
+    return " ".join(tags)[:SKELETON_MAX_CHARS]
+
+def distill_html(html_content: str) -> str:
+    """
+    Reduce HTML to its salient structure and visible text for the prompt
+    """
+    tree = HTMLParser(html_content)
+    tree.strip_tags(NON_CONTENT_TAGS)
+    skeleton = "".join(f"<{node.tag}>" for node in tree.css(SALIENT_SELECTOR)[:30])
+    root = tree.body or tree.root
+    text = root.text(separator=" ", strip=True)[:PROMPT_TEXT_CHARS] if root else ""
+    return f"{skeleton}\n{text}"
+
+def embed_skeleton(skeleton: str) -> Optional[List[float]]:
+    """
+    Embed an HTML skeleton for semantic cache lookups
+    """
+    try:
+        response = openai.embeddings.create(model=EMBEDDING_MODEL, input=skeleton)
+        return response.data[0].embedding
+    except Exception as e:
+        logger.error("Error embedding HTML structure: %s", e)
+        return None
+
 def get_html_content(url: str) -> str:
     """
     Get HTML content from a URL using Firecrawl
@@ -29,82 +155,251 @@ def get_html_content(url: str) -> str:
             return scrape_result.html
         return None
     except Exception as e:
-        print(f"Error getting HTML content: {str(e)}")
+        logger.error("Error getting HTML content: %s", e)
         return None
 
+# Names the rendered module imports; a class or field with one of them would shadow it
+RENDERED_NAMES = {"List", "Optional", "BaseModel", "Field"}
+
+def python_identifier(name: Any, prefix: str) -> str:
+    """
+    Turn a model-supplied name into a valid, non-reserved Python identifier
+    """
+    name = re.sub(r"\W+", "_", str(name)).strip("_")
+    if not name or name[0].isdigit():
+        name = f"{prefix}_{name}".rstrip("_")
+    if keyword.iskeyword(name) or name in RENDERED_NAMES:
+        name += "_"
+    return name if name.isidentifier() else prefix
+
+def render_pydantic_schema(spec: Dict[str, Any]) -> str:
+    """
+    Render a structured schema description as Pydantic model code
+    
+    Class and field names come from the model, so they are sanitized and
+    deduplicated before being written out as code.
+    """
+    lines = [
+        "from typing import List, Optional",
+        "",
+        "from pydantic import BaseModel, Field",
+        "",
+        "",
+        f"class {python_identifier(spec['class_name'], 'PageData')}(BaseModel):",
+    ]
+    seen = set()
+    for field in spec["fields"]:
+        name = base = python_identifier(field["name"], "field")
+        suffix = 2
+        while name in seen:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        seen.add(name)
+        lines.append(f"    {name}: {field['type']} = Field(description={field['description']!r})")
+    if not spec["fields"]:
+        lines.append("    pass")
+    return "\n".join(lines) + "\n"
+
+def python_field_type(value: Any) -> str:
+    """
+    Map a structured-markup value to one of the supported field types
+    """
+    if isinstance(value, bool):
+        return "Optional[bool]"
+    if isinstance(value, int):
+        return "Optional[int]"
+    if isinstance(value, float):
+        return "Optional[float]"
+    if isinstance(value, list):
+        return "List[str]"
+    return "Optional[str]"
+
+def field_name(key: str) -> str:
+    """
+    Convert a markup key such as datePublished or og:site_name to snake_case
+    """
+    name = re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", key.split(":")[-1])
+    name = re.sub(r"\W+", "_", name).strip("_").lower()
+    return f"field_{name}" if name[:1].isdigit() else name
+
+def schema_from_structured_markup(html_content: str) -> Optional[str]:
+    """
+    Build a schema directly from JSON-LD or OpenGraph markup, if the page has any
+    """
+    tree = HTMLParser(html_content)
+    fields = {}
+    class_name = None
+    
+    # JSON-LD blocks
+    for node in tree.css('script[type="application/ld+json"]'):
+        try:
+            data = json_loads(node.text())
+        except ValueError:
+            continue
+        for item in data if isinstance(data, list) else [data]:
+            if not isinstance(item, dict):
+                continue
+            if class_name is None and isinstance(item.get("@type"), str):
+                class_name = item["@type"]
+            for key, value in item.items():
+                if not key.startswith("@"):
+                    fields.setdefault(field_name(key), (python_field_type(value), f"JSON-LD {key}"))
+    
+    # OpenGraph meta tags
+    for node in tree.css('meta[property^="og:"]'):
+        key = node.attributes.get("property")
+        fields.setdefault(field_name(key), ("Optional[str]", f"OpenGraph {key}"))
+    
+    fields = {name: spec for name, spec in fields.items() if name}
+    if not fields:
+        return None
+    
+    class_name = re.sub(r"\W+", "", class_name or "") or "PageMetadata"
+    return render_pydantic_schema({
+        "class_name": class_name,
+        "fields": [
+            {"name": name, "type": field_type, "description": description}
+            for name, (field_type, description) in fields.items()
+        ]
+    })
+
 def generate_schema_with_openai(html_content: str) -> Dict[str, Any]:
     """
     Generate a schema using OpenAI's model
     """
     try:
         # Prepare the prompt for OpenAI
-        prompt = f"""Given this HTML content, create a Pydantic schema for extracting structured data.
+        prompt = f"""Given this HTML content, design a schema for extracting structured data.
         Focus on the main content, key information, and important metadata.
-        Return only the schema in Python code format.
+        Use a PascalCase class name and snake_case field names.
         
-        HTML Content:
-        {html_content[:2000]}  # Limiting content to avoid token limits
+        Page structure and text:
+        {distill_html(html_content)}
         """
         
-        # Call OpenAI API
+        # Reuse an earlier response for the same model and prompt
+        cache_key = llm_cache.make_key(model=SCHEMA_MODEL, system=SCHEMA_SYSTEM_PROMPT, prompt=prompt)
+        cached = llm_cache.get(cache_key, record=False)
+        if cached is not None:
+            llm_cache.record(hit=True)
+            return render_pydantic_schema(json_loads(cached))
+        
+        # Pages with the same structure usually need the same schema
+        embedding = embed_skeleton(html_skeleton(html_content))
+        if embedding is not None:
+            cached = llm_cache.semantic_get(embedding, record=False)
+            if cached is not None:
+                llm_cache.record(hit=True)
+                llm_cache.set(cache_key, cached)
+                return render_pydantic_schema(json_loads(cached))
+        
+        # Neither lookup found a response; this counts as one miss
+        llm_cache.record(hit=False)
+        
+        # Call OpenAI API (pinned sampling so cached answers stay representative)
         response = openai.chat.completions.create(
-            model="gpt-4",  # or "gpt-3.5-turbo" if you prefer
+            model=SCHEMA_MODEL,
             messages=[
-                {"role": "system", "content": "You are a helpful assistant that creates Pydantic schemas for web content extraction."},
+                {"role": "system", "content": SCHEMA_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.7,
+            response_format=SCHEMA_RESPONSE_FORMAT,
+            temperature=0,
+            seed=42,
             max_tokens=1000
         )
         
         if response.choices:
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
+            llm_cache.set(cache_key, content)
+            if embedding is not None:
+                llm_cache.semantic_set(embedding, content)
+            return render_pydantic_schema(json_loads(content))
         return None
             
     except Exception as e:
-        print(f"Error generating schema: {str(e)}")
+        logger.error("Error generating schema: %s", e)
         return None
 
+def schema_filename(url: str) -> str:
+    """
+    Build a safe, collision-resistant file name for a URL's schema
+    """
+    short = url.removeprefix("https://").removeprefix("http://").translate(FILENAME_TABLE)[:80]
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=6).hexdigest()
+    return f"generated_schema_{short}_{digest}.py"
+
 def create_schema_for_url(url: str) -> Dict[str, Any]:
     """
     Main function to create a schema for a given URL
     """
-    print(f"\nProcessing URL: {url}")
+    logger.info("Processing URL: %s", url)
     
     # Step 1: Get HTML content
-    print("\n1. Fetching HTML content...")
+    logger.info("1. Fetching HTML content...")
     html_content = get_html_content(url)
+    return create_schema_from_html(url, html_content)
+
+def create_schemas_for_urls(urls: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Create schemas for many URLs, fetching all pages concurrently first
+    
+    Pages come through the pooled HTTP/2 client in get_html_contents
+    rather than one blocking SDK call per URL. Returns a dict mapping each
+    URL to its schema, or None if it failed.
+    """
+    logger.info("1. Fetching HTML content for %d URLs...", len(urls))
+    html_contents = get_html_contents(urls)
+    
+    schemas = {}
+    for url, html_content in zip(urls, html_contents):
+        logger.info("Processing URL: %s", url)
+        schemas[url] = create_schema_from_html(url, html_content)
+    return schemas
+
+def create_schema_from_html(url: str, html_content: Optional[str]) -> Optional[str]:
+    """
+    Generate a schema for a fetched page and save it to a file named after the URL
+    """
     if not html_content:
-        print("Failed to get HTML content")
+        logger.error("Failed to get HTML content")
         return None
     
-    # Step 2: Generate schema
-    print("\n2. Generating schema with OpenAI...")
-    schema = generate_schema_with_openai(html_content)
+    # Step 2: Generate schema, preferring structured markup already on the page
+    schema = schema_from_structured_markup(html_content)
+    if schema:
+        logger.info("2. Built schema from JSON-LD/OpenGraph markup")
+    else:
+        logger.info("2. Generating schema with OpenAI...")
+        schema = generate_schema_with_openai(html_content)
     if not schema:
-        print("Failed to generate schema")
+        logger.error("Failed to generate schema")
         return None
     
     # Step 3: Save schema to file
     try:
-        filename = f"generated_schema_{url.replace('https://', '').replace('/', '_')}.py"
+        filename = schema_filename(url)
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(schema)
-        print(f"\nSchema saved to: {filename}")
+        logger.info("Schema saved to: %s", filename)
     except Exception as e:
-        print(f"Error saving schema: {str(e)}")
+        logger.error("Error saving schema: %s", e)
     
     return schema
 
 if __name__ == "__main__":
-    # Test URL
-    test_url = "https://www.ibm.com/think/topics/ai-agents"
-    print("Starting schema generation process...")
+    # URLs from the command line, or a test URL
+    urls = sys.argv[1:] or ["https://www.ibm.com/think/topics/ai-agents"]
+    logger.info("Starting schema generation process...")
     
-    # Generate schema
-    schema = create_schema_for_url(test_url)
+    # Generate schemas
+    if len(urls) == 1:
+        schemas = {urls[0]: create_schema_for_url(urls[0])}
+    else:
+        schemas = create_schemas_for_urls(urls)
     
-    if schema:
-        print("\nGenerated Schema:")
-        print("=" * 50)
-        print(schema) 
\ No newline at end of file
+    for url, schema in schemas.items():
+        if schema and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Generated Schema for %s:\n%s\n%s", url, "=" * 50, schema)
+    
+    logger.info("LLM cache: %d hits, %d misses", llm_cache.stats["hits"], llm_cache.stats["misses"]) 
\ No newline at end of file
@@ -15,8 +15,17 @@ CREDENTIALS_FILE = os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
 TOKEN_FILE = os.getenv('GOOGLE_TOKEN_FILE', 'token.json')
 
 # Upload/Download settings
-DEFAULT_CHUNK_SIZE = int(os.getenv('DEFAULT_CHUNK_SIZE', 1024 * 1024))  # 1MB
+DEFAULT_CHUNK_SIZE = int(os.getenv('DEFAULT_CHUNK_SIZE', 8 * 1024 * 1024))  # 8MB, a multiple of 256KB
 MAX_WORKERS = int(os.getenv('MAX_WORKERS', 4))
+SYNC_WORKERS = int(os.getenv('SYNC_WORKERS', 8))  # Concurrent uploads in sync
+NUM_RETRIES = int(os.getenv('NUM_RETRIES', 5))  # Backoff retries on 429/5xx
+MAX_REQUESTS_PER_SECOND = float(os.getenv('MAX_REQUESTS_PER_SECOND', 10))  # Drive per-user quota
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 60))  # Seconds per API request
+RESUMABLE_THRESHOLD = int(os.getenv('RESUMABLE_THRESHOLD', 5 * 1024 * 1024))  # 5MB
+PARALLEL_DOWNLOAD_THRESHOLD = int(os.getenv('PARALLEL_DOWNLOAD_THRESHOLD', 32 * 1024 * 1024))  # 32MB
+DOWNLOAD_RANGE_WORKERS = int(os.getenv('DOWNLOAD_RANGE_WORKERS', 8))
+MMAP_UPLOAD_THRESHOLD = int(os.getenv('MMAP_UPLOAD_THRESHOLD', 64 * 1024 * 1024))  # 64MB
+PREFETCH_DEPTH = int(os.getenv('PREFETCH_DEPTH', 4))  # Upload chunks read ahead of the network
 
 # Progress display settings
 PROGRESS_UPDATE_INTERVAL = float(os.getenv('PROGRESS_UPDATE_INTERVAL', 0.1))
@@ -27,6 +36,12 @@ SHOW_ETA = os.getenv('SHOW_ETA', 'true').lower() == 'true'
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 LOG_FILE = os.getenv('LOG_FILE', 'gdrive_operations.log')
 
+# Daemon settings
+# Prefer the per-user runtime directory, which is private and cleared on logout
+_runtime_dir = os.getenv('XDG_RUNTIME_DIR')
+DAEMON_SOCKET = os.getenv('GDRIVE_DAEMON_SOCKET', os.path.join(_runtime_dir, 'gdrive.sock') if _runtime_dir
+                          else str(Path.home() / '.cache' / 'gdrive' / 'daemon.sock'))
+
 # Google Drive API settings
 SCOPES = ['https://www.googleapis.com/auth/drive']
 
@@ -47,4 +62,12 @@ FILE_TYPE_FOLDERS = {
     'presentations': ['.ppt', '.pptx', '.odp'],
     'archives': ['.zip', '.rar', '.7z', '.tar', '.gz', '.bz2'],
     'code': ['.py', '.js', '.html', '.css', '.cpp', '.java', '.go', '.rs']
-} 
\ No newline at end of file
+} 
+
+# Extension → folder lookup, inverted once from FILE_TYPE_FOLDERS
+EXT_TO_FOLDER = {ext: folder for folder, exts in FILE_TYPE_FOLDERS.items() for ext in exts}
+
+
+def get_file_type_folder(file_name: str, default: str = 'other') -> str:
+    """Return the organization folder for a file based on its extension"""
+    return EXT_TO_FOLDER.get(Path(file_name).suffix.lower(), default)
@@ -7,17 +7,32 @@ Boilerplate code for Google Drive operations using Google API
 import os
 import io
 import json
+import asyncio
 import time
+import mmap
+import hashlib
+import mimetypes
+import multiprocessing
+import queue
+import random
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Callable
-from threading import Event, Thread
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple
+from threading import Event, Thread, Lock, local
+from itertools import chain
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
+import aiohttp
+import httplib2
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaUpload
+from googleapiclient.model import JsonModel
 from rich.console import Console
 from rich.progress import (
     Progress,
@@ -29,18 +44,284 @@ from rich.progress import (
     FileSizeColumn,
     TransferSpeedColumn,
     DownloadColumn,
+    MofNCompleteColumn,
 )
-from rich.table import Table
-from rich.live import Live
 import click
 
+from config import (
+    DEFAULT_CHUNK_SIZE, MAX_WORKERS, MAX_REQUESTS_PER_SECOND, HTTP_TIMEOUT,
+    RESUMABLE_THRESHOLD, PROGRESS_UPDATE_INTERVAL, PARALLEL_DOWNLOAD_THRESHOLD,
+    DOWNLOAD_RANGE_WORKERS, MMAP_UPLOAD_THRESHOLD, NUM_RETRIES, PREFETCH_DEPTH,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+# File metadata fields requested from the API
+FILE_FIELDS = 'id,name,size,mimeType,parents,createdTime,modifiedTime'
+
+# Fields needed to compare remote files against local ones during sync
+INDEX_FIELDS = 'id,name,size,md5Checksum,mimeType,modifiedTime'
+
+# Largest page files.list returns
+LIST_PAGE_SIZE = 1000
+
+# Maximum sub-requests the Drive batch endpoint accepts per call
+BATCH_SIZE = 100
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# Drive media upload endpoint used by the asyncio upload path
+UPLOAD_URL = 'https://www.googleapis.com/upload/drive/v3/files'
+
+# Read buffer size used when hashing files to check for duplicate uploads
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Response codes worth resuming a transfer after
+RETRIABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Longest backoff between retries, in seconds, unless the server asks for more
+MAX_BACKOFF = 60
+
+# Seconds to wait for a prefetched upload chunk before reading it directly
+PREFETCH_TIMEOUT = 30
+
+# Drive requires upload chunks in multiples of 256KB
+CHUNK_ALIGNMENT = 256 * 1024
+
+# O_DIRECT writes must be aligned to the block size in offset, length and memory
+DIRECT_IO_ALIGNMENT = 4096
 
 # Google Drive API scopes
 SCOPES = ['https://www.googleapis.com/auth/drive']
 
 
+def compute_md5(file_path: Path, bufsize: int = HASH_CHUNK_SIZE) -> str:
+    """Compute a file's MD5 hex digest, streaming it through one reused buffer
+    
+    Memory use stays at bufsize regardless of the file size.
+    """
+    md5 = hashlib.md5()
+    buf = bytearray(bufsize)
+    view = memoryview(buf)
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            md5.update(view[:n])
+    return md5.hexdigest()
+
+
+def escape_query(value: str) -> str:
+    """Escape a string for use inside single quotes in a Drive search query"""
+    return value.replace('\\', '\\\\').replace("'", "\\'")
+
+
+def is_retriable(error: Exception) -> bool:
+    """Whether a failed transfer step is worth resuming"""
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRIABLE_STATUSES
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRIABLE_STATUSES
+    return True
+
+
+def retry_delay(error: Optional[Exception], attempt: int) -> float:
+    """Seconds to wait before retry number attempt, with jitter
+    
+    A Retry-After header on the error's response is honored when it asks
+    for a longer wait than the exponential backoff.
+    """
+    delay = min(2 ** attempt + random.random(), MAX_BACKOFF)
+    if isinstance(error, HttpError):
+        headers = error.resp
+    elif isinstance(error, aiohttp.ClientResponseError):
+        headers = error.headers or {}
+    else:
+        return delay
+    try:
+        delay = max(delay, float(headers.get('retry-after', 0)))
+    except ValueError:
+        pass
+    return delay
+
+
+def write_aligned(fd: int, data: bytes, offset: int):
+    """pwrite data to an O_DIRECT file through a page-aligned buffer
+    
+    The write is padded up to DIRECT_IO_ALIGNMENT; callers truncate the file
+    back to its real size once all chunks are written.
+    """
+    if not data:
+        return
+    length = -(-len(data) // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT
+    with mmap.mmap(-1, length) as buf:
+        buf.write(data)
+        os.pwrite(fd, buf, offset)
+
+
+def pick_chunk_size(file_size: int) -> int:
+    """Pick a transfer chunk size for a file, aligned to 256KB
+    
+    Files up to the default chunk size move in one request; larger files use
+    the default, and very large files use bigger chunks to cut request count.
+    """
+    if file_size <= DEFAULT_CHUNK_SIZE:
+        chunk_size = file_size
+    elif file_size < 1024 ** 3:
+        chunk_size = DEFAULT_CHUNK_SIZE
+    else:
+        chunk_size = 4 * DEFAULT_CHUNK_SIZE
+    return max(CHUNK_ALIGNMENT, -(-chunk_size // CHUNK_ALIGNMENT) * CHUNK_ALIGNMENT)
+
+
+class MmapMediaUpload(MediaUpload):
+    """Upload body that serves chunks straight from a read-only memory map
+    
+    MediaFileUpload seeks and reads through a Python file object for every
+    chunk; slicing the mapping skips that buffered read path.
+    """
+    
+    def __init__(self, filename: str, mimetype: Optional[str] = None,
+                 chunksize: int = DEFAULT_CHUNK_SIZE, resumable: bool = True):
+        self._filename = filename
+        self._file = open(filename, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mimetype = mimetype or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        self._chunksize = chunksize
+        self._resumable = resumable
+        
+    def chunksize(self) -> int:
+        return self._chunksize
+        
+    def mimetype(self) -> str:
+        return self._mimetype
+        
+    def size(self) -> int:
+        return len(self._mm)
+        
+    def resumable(self) -> bool:
+        return self._resumable
+        
+    def getbytes(self, begin: int, length: int) -> bytes:
+        return self._mm[begin:begin + length]
+        
+    def has_stream(self) -> bool:
+        return False
+        
+    def close(self):
+        """Release the memory map and file handle"""
+        self._mm.close()
+        self._file.close()
+
+
+class FastJsonModel(JsonModel):
+    """JsonModel that parses API responses with orjson when it is installed"""
+    
+    def deserialize(self, content):
+        body = json_loads(content)
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
+
+class PrefetchMediaUpload(MediaUpload):
+    """Upload body whose chunks are read ahead by a background thread
+    
+    Disk reads for the next chunks overlap the HTTP send of the current one.
+    Requests that don't continue the sequential stream, such as retries after
+    a partial 308, are served by a direct read instead.
+    """
+    
+    def __init__(self, filename: str, mimetype: Optional[str] = None,
+                 chunksize: int = DEFAULT_CHUNK_SIZE, resumable: bool = True,
+                 depth: int = PREFETCH_DEPTH):
+        self._filename = filename
+        self._file = open(filename, 'rb')
+        self._size = os.fstat(self._file.fileno()).st_size
+        self._mimetype = mimetype or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        self._chunksize = chunksize
+        self._resumable = resumable
+        self._queue = queue.Queue(maxsize=depth)
+        self._next_offset = 0
+        self._sequential = True
+        self._stop = Event()
+        self._reader = Thread(target=self._prefetch, daemon=True)
+        self._reader.start()
+        
+    def _prefetch(self):
+        offset = 0
+        try:
+            with open(self._filename, 'rb') as f:
+                while offset < self._size and not self._stop.is_set():
+                    data = f.read(self._chunksize)
+                    if not data:
+                        break
+                    self._put((offset, data))
+                    offset += len(data)
+        except OSError:
+            pass
+        # An out-of-sequence marker after the last chunk, early EOF or a read
+        # error sends getbytes to direct reads instead of waiting forever
+        self._put((-1, b''))
+        
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        
+    def chunksize(self) -> int:
+        return self._chunksize
+        
+    def mimetype(self) -> str:
+        return self._mimetype
+        
+    def size(self) -> int:
+        return self._size
+        
+    def resumable(self) -> bool:
+        return self._resumable
+        
+    def getbytes(self, begin: int, length: int) -> bytes:
+        if self._sequential and begin == self._next_offset and length <= self._chunksize:
+            # The client always asks for a full chunk; the last one is shorter
+            expected = min(length, self._size - begin)
+            try:
+                offset, data = self._queue.get(timeout=PREFETCH_TIMEOUT)
+            except queue.Empty:
+                offset, data = -1, b''
+            if offset == begin and len(data) >= expected:
+                self._next_offset = begin + expected
+                return data[:expected]
+            self._sequential = False
+        
+        self._file.seek(begin)
+        return self._file.read(length)
+        
+    def has_stream(self) -> bool:
+        return False
+        
+    def close(self):
+        """Stop the reader thread and release file handles"""
+        self._stop.set()
+        self._reader.join()
+        self._file.close()
+
+
 class GDriveProgressCallback:
-    """Progress callback for Google Drive operations"""
+    """Progress callback for Google Drive operations
+    
+    Transfer loops only record the byte count; the owning ThrottledProgress
+    pushes it to the display at a fixed interval.
+    """
     
     def __init__(self, progress: Progress, task_id: TaskID, total_size: int):
         self.progress = progress
@@ -49,8 +330,15 @@ class GDriveProgressCallback:
         self.transferred = 0
         
     def update(self, chunk_size: int):
-        """Update progress with transferred bytes"""
+        """Record transferred bytes"""
         self.transferred += chunk_size
+        
+    def set_completed(self, completed: int):
+        """Record the total bytes transferred so far"""
+        self.transferred = completed
+        
+    def flush(self):
+        """Push the recorded byte count to the progress display"""
         self.progress.update(
             self.task_id,
             completed=self.transferred,
@@ -58,18 +346,108 @@ class GDriveProgressCallback:
         )
 
 
+class ThrottledProgress(Progress):
+    """Progress display whose transfer tasks are refreshed from one background thread"""
+    
+    def __init__(self, *columns, update_interval: float = PROGRESS_UPDATE_INTERVAL, **kwargs):
+        super().__init__(*columns, refresh_per_second=1 / update_interval, **kwargs)
+        self.update_interval = update_interval
+        self._transfers: List[GDriveProgressCallback] = []
+        self._transfers_lock = Lock()
+        self._stop_updates = Event()
+        self._updater: Optional[Thread] = None
+        
+    def __enter__(self) -> "ThrottledProgress":
+        super().__enter__()
+        self._stop_updates.clear()
+        self._updater = Thread(target=self._run_updates, daemon=True)
+        self._updater.start()
+        return self
+        
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop_updates.set()
+        self._updater.join()
+        self._flush_transfers()
+        super().__exit__(exc_type, exc_val, exc_tb)
+        
+    def add_transfer(self, filename: str, total_size: int) -> GDriveProgressCallback:
+        """Add a task for one file transfer and return its callback"""
+        task_id = self.add_task("transfer", filename=filename, total=total_size)
+        callback = GDriveProgressCallback(self, task_id, total_size)
+        with self._transfers_lock:
+            self._transfers.append(callback)
+        return callback
+        
+    def finish_transfer(self, callback: GDriveProgressCallback):
+        """Stop tracking a transfer and remove its task"""
+        with self._transfers_lock:
+            self._transfers.remove(callback)
+        self.remove_task(callback.task_id)
+        
+    def _flush_transfers(self):
+        with self._transfers_lock:
+            transfers = list(self._transfers)
+        for callback in transfers:
+            callback.flush()
+        
+    def _run_updates(self):
+        while not self._stop_updates.wait(self.update_interval):
+            self._flush_transfers()
+
+
+class TokenBucket:
+    """Thread-safe token bucket that paces requests to a steady rate"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = Lock()
+        
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
 class GoogleDriveManager:
     """Google Drive Manager with authentication and file operations"""
     
-    def __init__(self, credentials_file: str = "credentials.json", token_file: str = "token.json"):
+    def __init__(self, credentials_file: str = "credentials.json", token_file: str = "token.json",
+                 num_retries: int = NUM_RETRIES):
         self.credentials_file = credentials_file
         self.token_file = token_file
+        self.num_retries = num_retries
         self.service = None
+        self.creds = None
         self.console = Console()
         self.authenticated = False
+        self.rate_limiter = TokenBucket(MAX_REQUESTS_PER_SECOND)
+        self._thread_local = local()
+        self._service_pool: queue.LifoQueue = queue.LifoQueue()
+        self._discovery_doc = None
+        self.metadata_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
         
     def authenticate(self) -> bool:
-        """Authenticate with Google Drive API"""
+        """Authenticate with Google Drive API
+        
+        Only the first successful call loads credentials and builds the
+        service; later calls reuse them.
+        """
+        if self.authenticated:
+            return True
+        
         creds = None
         
         # Load existing token
@@ -121,7 +499,8 @@ class GoogleDriveManager:
         
         # Build service
         try:
-            self.service = build('drive', 'v3', credentials=creds)
+            self.creds = creds
+            self.service = self.build_service()
             self.authenticated = True
             self.console.print("✅ Google Drive service initialized", style="green")
             return True
@@ -129,13 +508,84 @@ class GoogleDriveManager:
             self.console.print(f"❌ Failed to build service: {e}", style="red")
             return False
     
-    def get_file_info(self, file_id: str) -> Optional[Dict[str, Any]]:
+    def get_thread_service(self):
+        """Get a Drive service owned by the calling thread
+        
+        httplib2 connections are not thread-safe, so every worker thread
+        builds its own service from the shared credentials. Meant for the
+        long-lived metadata pool; transfer workers use pooled_service.
+        """
+        service = getattr(self._thread_local, 'service', None)
+        if service is None:
+            service = self.build_service()
+            self._thread_local.service = service
+        return service
+    
+    @contextmanager
+    def pooled_service(self):
+        """Borrow a Drive service, and its open connection, from the manager's pool
+        
+        Short-lived transfer threads borrow instead of building a service per
+        thread. The pool grows to the peak number of concurrent workers, so
+        connections match the worker count and stay warm across batches of
+        transfers instead of being handshaken again for every new pool.
+        """
+        try:
+            service = self._service_pool.get_nowait()
+        except queue.Empty:
+            service = self.build_service()
+        try:
+            yield service
+        finally:
+            self._service_pool.put(service)
+    
+    def build_service(self):
+        """Build a Drive service on its own authorized HTTP session
+        
+        The session keeps its connection to the API alive, so every call made
+        through the returned service reuses one TLS connection instead of
+        handshaking again.
+        """
+        authed_http = AuthorizedHttp(self.creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        return build_from_document(self.get_discovery_doc(), http=authed_http, model=FastJsonModel())
+    
+    def get_discovery_doc(self) -> str:
+        """Get the Drive v3 discovery document
+        
+        The document ships with googleapiclient, so it is read from disk once
+        instead of being fetched over the network on every start.
+        """
+        if self._discovery_doc is None:
+            self._discovery_doc = get_static_doc('drive', 'v3')
+            if self._discovery_doc is None:
+                raise RuntimeError("Drive v3 discovery document not bundled with googleapiclient")
+        return self._discovery_doc
+    
+    def create_progress(self, size_column) -> ThrottledProgress:
+        """Create a transfer progress display"""
+        return ThrottledProgress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]{task.fields[filename]}", justify="right"),
+            BarColumn(bar_width=None),
+            "[progress.percentage]{task.percentage:>3.1f}%",
+            "•",
+            size_column,
+            "•",
+            TransferSpeedColumn(),
+            "•",
+            TimeRemainingColumn(),
+            console=self.console,
+            transient=True,
+        )
+    
+    def get_file_info(self, file_id: str, service=None) -> Optional[Dict[str, Any]]:
         """Get file information from Google Drive"""
+        service = service or self.service
         try:
-            file_info = self.service.files().get(
+            file_info = self.execute(service.files().get(
                 fileId=file_id, 
-                fields='id,name,size,mimeType,parents,createdTime,modifiedTime'
-            ).execute()
+                fields=FILE_FIELDS
+            ))
             return file_info
         except HttpError as e:
             self.console.print(f"❌ Error getting file info: {e}", style="red")
@@ -143,82 +593,255 @@ class GoogleDriveManager:
     
     def list_files(self, folder_id: str = None, query: str = None, max_results: int = 100) -> List[Dict[str, Any]]:
         """List files in Google Drive"""
+        return list(self.iter_files(folder_id, query, max_results))
+    
+    def iter_files(self, folder_id: str = None, query: str = None,
+                   max_results: int = 100) -> Iterator[Dict[str, Any]]:
+        """Yield files in Google Drive page by page, up to max_results"""
+        # Build query
+        search_query = []
+        if folder_id:
+            search_query.append(f"'{folder_id}' in parents")
+        if query:
+            search_query.append(query)
+        
+        query_string = " and ".join(search_query) if search_query else None
+        
         try:
-            # Build query
-            search_query = []
-            if folder_id:
-                search_query.append(f"'{folder_id}' in parents")
-            if query:
-                search_query.append(query)
-            
-            query_string = " and ".join(search_query) if search_query else None
-            
-            results = self.service.files().list(
-                q=query_string,
-                pageSize=max_results,
-                fields="nextPageToken, files(id,name,size,mimeType,parents,createdTime,modifiedTime)"
-            ).execute()
-            
-            return results.get('files', [])
+            for files in self.iter_pages(query_string, FILE_FIELDS, max_items=max_results):
+                yield from files
         except HttpError as e:
             self.console.print(f"❌ Error listing files: {e}", style="red")
-            return []
     
-    def download_file(self, file_id: str, output_path: str, chunk_size: int = 1024*1024) -> bool:
-        """Download file from Google Drive with progress tracking"""
+    def iter_pages(self, query: Optional[str], fields: str, page_token: Optional[str] = None,
+                   max_items: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yield pages of files.list results, prefetching the next page
+        
+        Each following page is requested on the metadata pool while the
+        caller consumes the current one, so page latency overlaps processing.
+        Stops once max_items files have been yielded.
+        """
+        def fetch(token: Optional[str], page_size: int) -> Dict[str, Any]:
+            return self.execute(self.get_thread_service().files().list(
+                q=query,
+                pageSize=page_size,
+                pageToken=token,
+                fields=f"nextPageToken, files({fields})"
+            ))
+        
+        remaining = max_items
+        future = self.metadata_executor.submit(fetch, page_token, min(remaining or LIST_PAGE_SIZE, LIST_PAGE_SIZE))
+        while future:
+            results = future.result()
+            files = results.get('files', [])
+            if remaining is not None:
+                files = files[:remaining]
+                remaining -= len(files)
+            
+            next_token = results.get('nextPageToken')
+            future = None
+            if next_token and remaining != 0:
+                future = self.metadata_executor.submit(fetch, next_token, min(remaining or LIST_PAGE_SIZE, LIST_PAGE_SIZE))
+            yield files
+    
+    def get_file_infos(self, file_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get information for many files using batched requests
+        
+        Returns a dict keyed by file ID; files that could not be fetched map to None.
+        """
+        requests = {
+            file_id: self.service.files().get(fileId=file_id, fields=FILE_FIELDS)
+            for file_id in file_ids
+        }
+        return self.execute_batch(requests)
+    
+    def execute_batch(self, requests: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Execute API requests in batches of up to BATCH_SIZE per HTTP call
+        
+        Sub-requests that hit rate limits or transient errors are sent again
+        in a later batch after a backoff. Creates (POST) may have taken
+        effect even when they report an error, and Drive allows same-name
+        siblings, so they are never replayed blindly: batches holding them
+        are sent once per round, and a failed create is first looked up by
+        name under its parent and only resent if it is missing. Results are
+        keyed like the input dict, with None for failed requests.
+        """
+        results = {key: None for key in requests}
+        pending = dict(requests)
+        
+        for attempt in range(self.num_retries + 1):
+            retry, retry_errors, unconfirmed, answered = {}, [], {}, set()
+            
+            def callback(request_id, response, exception):
+                answered.add(request_id)
+                if exception is None:
+                    results[request_id] = response
+                elif attempt < self.num_retries and is_retriable(exception):
+                    request = pending[request_id]
+                    (unconfirmed if request.method == 'POST' else retry)[request_id] = request
+                    retry_errors.append(exception)
+                else:
+                    self.console.print(f"❌ Batch request failed for {request_id}: {exception}", style="red")
+            
+            items = list(pending.items())
+            for start in range(0, len(items), BATCH_SIZE):
+                chunk = items[start:start + BATCH_SIZE]
+                creates = any(request.method == 'POST' for _, request in chunk)
+                batch = self.service.new_batch_http_request(callback=callback)
+                for key, request in chunk:
+                    batch.add(request, request_id=key)
+                try:
+                    if creates:
+                        batch.execute()
+                    else:
+                        self.call_with_resume(batch.execute)
+                except (HttpError, ConnectionError, TimeoutError, httplib2.HttpLib2Error) as e:
+                    if not (creates and attempt < self.num_retries and is_retriable(e)):
+                        self.console.print(f"❌ Batch failed: {e}", style="red")
+                        continue
+                    # The server may have applied any sub-request it did not answer
+                    for key, request in chunk:
+                        if key not in answered:
+                            (unconfirmed if request.method == 'POST' else retry)[key] = request
+                    retry_errors.append(e)
+            
+            if unconfirmed:
+                found = self.find_created(unconfirmed)
+                for key, request in unconfirmed.items():
+                    if key not in found:
+                        self.console.print(f"❌ Batch request failed for {key}: could not check whether it was applied", style="red")
+                    elif found[key]:
+                        results[key] = found[key]
+                    else:
+                        retry[key] = request
+            
+            if not retry:
+                break
+            time.sleep(max(retry_delay(e, attempt) for e in retry_errors))
+            pending = retry
+        
+        return results
+    
+    def find_created(self, creates: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Look up files that unanswered create requests may have made
+        
+        Matches each request's name and mimeType under its first parent
+        (My Drive's root if it has none). Returns {'id': ...} for files that
+        exist and None for ones that do not; keys whose lookup itself failed
+        are left out.
+        """
+        lookups = {}
+        for key, request in creates.items():
+            body = json.loads(request.body or '{}')
+            query = [f"name = '{escape_query(body.get('name', ''))}'", "trashed = false",
+                     f"'{(body.get('parents') or ['root'])[0]}' in parents"]
+            if body.get('mimeType'):
+                query.append(f"mimeType = '{body['mimeType']}'")
+            lookups[key] = self.service.files().list(q=" and ".join(query), pageSize=1, fields="files(id)")
+        
+        return {
+            key: (result.get('files') or [None])[0]
+            for key, result in self.execute_batch(lookups).items()
+            if result is not None
+        }
+    
+    def download_file(self, file_id: str, output_path: str, chunk_size: Optional[int] = None,
+                      direct_io: bool = False) -> bool:
+        """Download file from Google Drive with progress tracking
+        
+        With direct_io the file is written with O_DIRECT, bypassing the page
+        cache; chunk_size must then be a multiple of DIRECT_IO_ALIGNMENT.
+        """
         if not self.authenticated:
             self.console.print("❌ Not authenticated", style="red")
             return False
         
+        if direct_io and not hasattr(os, 'O_DIRECT'):
+            self.console.print("⚠️  O_DIRECT is not supported here, using buffered writes", style="yellow")
+            direct_io = False
+        if direct_io and chunk_size and chunk_size % DIRECT_IO_ALIGNMENT:
+            self.console.print(f"❌ Chunk size must be a multiple of {DIRECT_IO_ALIGNMENT} for direct I/O", style="red")
+            return False
+        
+        with self.create_progress(DownloadColumn()) as progress:
+            return self.transfer_download(self.service, progress, file_id, Path(output_path), chunk_size,
+                                          direct_io=direct_io)
+    
+    def download_files(self, file_ids: List[str], output_dir: str,
+                       chunk_size: Optional[int] = None,
+                       max_workers: int = MAX_WORKERS) -> List[Tuple[str, bool]]:
+        """Download several files concurrently into a directory
+        
+        Returns (file_id, success) pairs in completion order.
+        """
+        if not self.authenticated:
+            self.console.print("❌ Not authenticated", style="red")
+            return [(file_id, False) for file_id in file_ids]
+        
+        output_dir = Path(output_dir)
+        
+        def worker(file_id: str) -> bool:
+            with self.pooled_service() as service:
+                return self.transfer_download(service, progress, file_id, None, chunk_size, output_dir)
+        
+        with self.create_progress(DownloadColumn()) as progress:
+            return self.run_transfers(worker, file_ids, max_workers)
+    
+    def transfer_download(self, service, progress: ThrottledProgress, file_id: str,
+                          output_path: Optional[Path], chunk_size: Optional[int],
+                          output_dir: Optional[Path] = None, direct_io: bool = False) -> bool:
+        """Download one file using the given service and shared progress display
+        
+        The metadata lookup runs on a helper thread while the first chunk is
+        requested, so the two round trips overlap.
+        """
         try:
-            # Get file info
-            file_info = self.get_file_info(file_id)
+            # Get file info alongside the first chunk
+            info_future = self.metadata_executor.submit(self.fetch_file_info, file_id)
+            try:
+                first_chunk = self.call_with_resume(self.fetch_range, service, file_id,
+                                                    0, (chunk_size or DEFAULT_CHUNK_SIZE) - 1)
+            except HttpError as e:
+                # Range requests on empty files are unsatisfiable
+                if e.resp.status != 416:
+                    raise
+                first_chunk = b''
+            
+            file_info = info_future.result()
             if not file_info:
                 return False
             
             file_name = file_info['name']
             file_size = int(file_info.get('size', 0))
+            chunk_size = chunk_size or pick_chunk_size(file_size)
             
             # Create output directory
-            output_path = Path(output_path)
+            if output_path is None:
+                output_path = output_dir / file_name
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Set up progress tracking
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[bold blue]{task.fields[filename]}", justify="right"),
-                BarColumn(bar_width=None),
-                "[progress.percentage]{task.percentage:>3.1f}%",
-                "•",
-                DownloadColumn(),
-                "•",
-                TransferSpeedColumn(),
-                "•",
-                TimeRemainingColumn(),
-                console=self.console,
-                transient=True,
-            ) as progress:
-                
-                task_id = progress.add_task(
-                    "download",
-                    filename=file_name,
-                    total=file_size
-                )
-                
-                # Download file
-                request = self.service.files().get_media(fileId=file_id)
+            callback = progress.add_transfer(file_name, file_size)
+            callback.set_completed(len(first_chunk))
+            
+            # Large files fetch the rest as parallel byte ranges; direct I/O
+            # always goes through this path since it needs aligned pwrites
+            if (file_size >= PARALLEL_DOWNLOAD_THRESHOLD or direct_io) and hasattr(os, 'pwrite'):
+                self.download_ranges(file_id, output_path, file_size, chunk_size, callback,
+                                     first_chunk, direct_io)
+            else:
                 with open(output_path, 'wb') as fh:
-                    downloader = MediaIoBaseDownload(fh, request, chunksize=chunk_size)
-                    
-                    done = False
-                    while done is False:
-                        status, done = downloader.next_chunk()
-                        if status:
-                            progress.update(
-                                task_id,
-                                completed=int(status.resumable_progress)
-                            )
+                    fh.write(first_chunk)
+                    offset = len(first_chunk)
+                    while offset < file_size:
+                        data = self.call_with_resume(self.fetch_range, service, file_id,
+                                                     offset, min(offset + chunk_size, file_size) - 1)
+                        if not data:
+                            raise IOError(f"Download ended early at byte {offset} of {file_size}")
+                        fh.write(data)
+                        offset += len(data)
+                        callback.set_completed(offset)
             
+            progress.finish_transfer(callback)
             self.console.print(f"✅ Downloaded: {file_name} → {output_path}", style="green")
             return True
             
@@ -229,71 +852,438 @@ class GoogleDriveManager:
             self.console.print(f"❌ Unexpected error: {e}", style="red")
             return False
     
+    def call_with_resume(self, step: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run one API or transfer step, repeating it after transient failures
+        
+        Retries back off exponentially with jitter on rate limits, 5xx
+        responses and network errors. Transfer steps pick up where they
+        stopped: a resumable upload request that failed asks its session for
+        the committed offset (an empty PUT with Content-Range: bytes */total)
+        before sending more, and download steps re-request the range from
+        their recorded byte offset.
+        
+        Steps must not retry on their own (pass num_retries=0 to the client
+        library), or the attempts multiply.
+        """
+        for attempt in range(self.num_retries + 1):
+            try:
+                return step(*args, **kwargs)
+            except (HttpError, ConnectionError, TimeoutError, httplib2.HttpLib2Error) as e:
+                if attempt == self.num_retries or not is_retriable(e):
+                    raise
+                delay = retry_delay(e, attempt)
+                self.console.print(f"⚠️  Request interrupted ({e}), retrying in {delay:.1f}s", style="yellow")
+                time.sleep(delay)
+    
+    async def call_with_resume_async(self, step: Callable[..., Any], *args, **kwargs) -> Any:
+        """Await one aiohttp step, repeating it after transient failures
+        
+        Uses the same policy as call_with_resume: rate limits, 5xx responses
+        and network errors are retried with backoff, up to num_retries times.
+        """
+        for attempt in range(self.num_retries + 1):
+            try:
+                return await step(*args, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.num_retries or not is_retriable(e):
+                    raise
+                delay = retry_delay(e, attempt)
+                self.console.print(f"⚠️  Request interrupted ({e}), retrying in {delay:.1f}s", style="yellow")
+                await asyncio.sleep(delay)
+    
+    def execute(self, request) -> Any:
+        """Execute an API request with backoff on transient failures"""
+        return self.call_with_resume(request.execute)
+    
+    def fetch_file_info(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Get file information on the calling thread's own service"""
+        return self.get_file_info(file_id, self.get_thread_service())
+    
+    def fetch_range(self, service, file_id: str, start: int, end: int) -> bytes:
+        """Fetch bytes start..end (inclusive) of a file's content
+        
+        Makes a single attempt; callers retry it through call_with_resume.
+        """
+        request = service.files().get_media(fileId=file_id)
+        request.headers['Range'] = f'bytes={start}-{end}'
+        return request.execute(num_retries=0)
+    
+    def download_ranges(self, file_id: str, output_path: Path, file_size: int,
+                        chunk_size: int, callback: GDriveProgressCallback,
+                        first_chunk: bytes = b'', direct_io: bool = False):
+        """Download a file as concurrent Range requests written in place
+        
+        Each worker thread fetches chunk_size slices on its own service and
+        writes them at their offset with os.pwrite, so no reassembly is needed.
+        Bytes already fetched are passed in as first_chunk. With direct_io
+        the file is opened with O_DIRECT and written through aligned buffers.
+        """
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        if direct_io:
+            flags |= os.O_DIRECT
+        write_at = write_aligned if direct_io else os.pwrite
+        
+        fd = os.open(output_path, flags, 0o644)
+        try:
+            os.ftruncate(fd, file_size)
+            write_at(fd, first_chunk, 0)
+            callback_lock = Lock()
+            
+            def fetch(offset: int):
+                end = min(offset + chunk_size, file_size) - 1
+                self.rate_limiter.acquire()
+                with self.pooled_service() as service:
+                    data = self.call_with_resume(self.fetch_range, service, file_id, offset, end)
+                write_at(fd, data, offset)
+                with callback_lock:
+                    callback.update(len(data))
+            
+            with ThreadPoolExecutor(max_workers=DOWNLOAD_RANGE_WORKERS) as executor:
+                futures = [executor.submit(fetch, offset)
+                           for offset in range(len(first_chunk), file_size, chunk_size)]
+                for future in as_completed(futures):
+                    future.result()
+            
+            if direct_io:
+                # Drop the padding written after the last aligned chunk
+                os.ftruncate(fd, file_size)
+        finally:
+            os.close(fd)
+    
     def upload_file(self, file_path: str, parent_folder_id: str = None, 
-                   chunk_size: int = 1024*1024) -> Optional[str]:
+                   chunk_size: Optional[int] = None) -> Optional[str]:
         """Upload file to Google Drive with progress tracking"""
         if not self.authenticated:
             self.console.print("❌ Not authenticated", style="red")
             return None
         
+        with self.create_progress(FileSizeColumn()) as progress:
+            return self.transfer_upload(self.service, progress, Path(file_path),
+                                        parent_folder_id, chunk_size)
+    
+    def upload_files(self, file_paths: List[str], parent_folder_id: str = None,
+                     chunk_size: Optional[int] = None,
+                     max_workers: int = MAX_WORKERS,
+                     existing_ids: Optional[Dict[str, str]] = None,
+                     deduplicate: bool = True,
+                     parent_ids: Optional[Dict[str, str]] = None) -> List[Tuple[str, Optional[str]]]:
+        """Upload several files concurrently
+        
+        Paths found in existing_ids replace the content of that Drive file
+        instead of creating a new one, and paths in parent_ids go to that
+        folder instead of parent_folder_id. Returns (file_path, file_id) pairs
+        in completion order, with a file ID of None for failed uploads.
+        """
+        existing_ids = existing_ids or {}
+        parent_ids = parent_ids or {}
+        if not self.authenticated:
+            self.console.print("❌ Not authenticated", style="red")
+            return [(file_path, None) for file_path in file_paths]
+        
+        def worker(file_path: str) -> Optional[str]:
+            with self.pooled_service() as service:
+                return self.transfer_upload(service, progress, Path(file_path),
+                                            parent_ids.get(file_path, parent_folder_id), chunk_size,
+                                            existing_ids.get(file_path), deduplicate)
+        
+        with self.create_progress(FileSizeColumn()) as progress:
+            return self.run_transfers(worker, file_paths, max_workers)
+    
+    def upload_files_multiprocess(self, file_paths: List[str], parent_folder_id: str = None,
+                                  chunk_size: Optional[int] = None,
+                                  max_workers: int = MAX_WORKERS,
+                                  existing_ids: Optional[Dict[str, str]] = None,
+                                  parent_ids: Optional[Dict[str, str]] = None) -> List[Tuple[str, Optional[str]]]:
+        """Upload several files from a pool of worker processes
+        
+        Each worker builds its own manager from the saved token, so uploads
+        do not contend for the GIL. Only (path, folder ID, chunk size,
+        existing ID) tuples cross the process boundary. Returns
+        (file_path, file_id) pairs in completion order.
+        """
+        existing_ids = existing_ids or {}
+        parent_ids = parent_ids or {}
+        if not self.authenticated:
+            self.console.print("❌ Not authenticated", style="red")
+            return [(file_path, None) for file_path in file_paths]
+        
+        results = []
+        progress = Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]Uploading"),
+            BarColumn(bar_width=None),
+            MofNCompleteColumn(),
+            "•",
+            TimeRemainingColumn(),
+            console=self.console,
+            transient=True,
+        )
+        # Forked children would inherit the parent's open httplib2/SSL sockets and
+        # thread locks; spawned ones start clean and authenticate from the token file
+        with progress, ProcessPoolExecutor(
+                max_workers=max(1, min(max_workers, len(file_paths) or 1)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_upload_process,
+                initargs=(self.credentials_file, self.token_file, self.num_retries)) as executor:
+            task_id = progress.add_task("upload", total=len(file_paths))
+            futures = {}
+            for file_path in file_paths:
+                self.rate_limiter.acquire()
+                future = executor.submit(_upload_in_process, file_path,
+                                         parent_ids.get(file_path, parent_folder_id),
+                                         chunk_size, existing_ids.get(file_path))
+                futures[future] = file_path
+            
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    file_id = future.result()
+                except Exception as e:
+                    self.console.print(f"❌ Upload failed: {file_path}: {e}", style="red")
+                    file_id = None
+                else:
+                    if file_id:
+                        self.console.print(f"✅ Uploaded: {Path(file_path).name} (ID: {file_id})", style="green")
+                    else:
+                        self.console.print(f"❌ Upload failed: {file_path}", style="red")
+                results.append((file_path, file_id))
+                progress.advance(task_id)
+        
+        return results
+    
+    async def upload_files_async(self, file_paths: List[str], parent_folder_id: str = None,
+                                 chunk_size: Optional[int] = None,
+                                 concurrency: int = MAX_WORKERS,
+                                 existing_ids: Optional[Dict[str, str]] = None,
+                                 parent_ids: Optional[Dict[str, str]] = None) -> List[Tuple[str, Optional[str]]]:
+        """Upload several files as concurrent resumable uploads on one event loop
+        
+        Talks to the Drive upload endpoint directly with aiohttp, so the
+        number of in-flight uploads is bounded by a semaphore rather than by
+        a thread per transfer. Paths found in existing_ids update that Drive
+        file and paths in parent_ids go to that folder instead of
+        parent_folder_id. Returns (file_path, file_id) pairs in input order.
+        """
+        existing_ids = existing_ids or {}
+        parent_ids = parent_ids or {}
+        if not self.authenticated:
+            self.console.print("❌ Not authenticated", style="red")
+            return [(file_path, None) for file_path in file_paths]
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        with self.create_progress(FileSizeColumn()) as progress:
+            # Size the connection pool to the concurrency so every in-flight
+            # upload keeps its own connection and none wait on the pool
+            connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency, ttl_dns_cache=300)
+            async with aiohttp.ClientSession(connector=connector) as session:
+                file_ids = await asyncio.gather(*(
+                    self.transfer_upload_async(session, semaphore, progress, Path(file_path),
+                                               parent_ids.get(file_path, parent_folder_id), chunk_size,
+                                               existing_ids.get(file_path))
+                    for file_path in file_paths
+                ))
+        return list(zip(file_paths, file_ids))
+    
+    def auth_headers(self) -> Dict[str, str]:
+        """Get an Authorization header, refreshing the access token if needed"""
+        if not self.creds.valid:
+            self.creds.refresh(Request())
+        return {'Authorization': f'Bearer {self.creds.token}'}
+    
+    async def transfer_upload_async(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                    progress: ThrottledProgress, file_path: Path,
+                                    parent_folder_id: Optional[str], chunk_size: Optional[int],
+                                    existing_id: Optional[str] = None) -> Optional[str]:
+        """Upload one file over aiohttp
+        
+        Files below RESUMABLE_THRESHOLD go up as one multipart request; larger
+        ones use the resumable protocol, which costs an extra round trip to
+        open the session but lets chunks be retried.
+        """
+        async with semaphore:
+            try:
+                file_size = file_path.stat().st_size
+                file_name = file_path.name
+                chunk_size = chunk_size or pick_chunk_size(file_size)
+                mimetype = mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+                
+                file_metadata = {'name': file_name}
+                if parent_folder_id and not existing_id:
+                    file_metadata['parents'] = [parent_folder_id]
+                
+                # Update in place for known files
+                method, url = ('PATCH', f'{UPLOAD_URL}/{existing_id}') if existing_id else ('POST', UPLOAD_URL)
+                
+                callback = progress.add_transfer(file_name, file_size)
+                
+                if file_size < RESUMABLE_THRESHOLD:
+                    data = await asyncio.to_thread(file_path.read_bytes)
+                    
+                    async def send_multipart():
+                        # A multipart body is consumed by sending, so each attempt builds its own
+                        with aiohttp.MultipartWriter('related') as body:
+                            body.append_json(file_metadata)
+                            body.append(data, {'Content-Type': mimetype})
+                        async with session.request(method, url, params={'uploadType': 'multipart', 'fields': 'id'},
+                                                   data=body, headers=self.auth_headers()) as resp:
+                            resp.raise_for_status()
+                            return await resp.json(content_type=None)
+                    
+                    response = await self.call_with_resume_async(send_multipart)
+                    callback.set_completed(file_size)
+                else:
+                    response = await self.send_resumable_async(session, method, url, file_path, file_size,
+                                                               file_metadata, mimetype, chunk_size, callback)
+                
+                progress.finish_transfer(callback)
+                file_id = response.get('id')
+                self.console.print(f"✅ Uploaded: {file_name} (ID: {file_id})", style="green")
+                return file_id
+                
+            except aiohttp.ClientError as e:
+                self.console.print(f"❌ Upload failed: {e}", style="red")
+                return None
+            except Exception as e:
+                self.console.print(f"❌ Unexpected error: {e}", style="red")
+                return None
+    
+    async def send_resumable_async(self, session: aiohttp.ClientSession, method: str, url: str,
+                                   file_path: Path, file_size: int, file_metadata: Dict[str, Any],
+                                   mimetype: str, chunk_size: int,
+                                   callback: GDriveProgressCallback) -> Dict[str, Any]:
+        """Open a resumable upload session and send the file in chunks
+        
+        A chunk that fails with a retriable error is followed, after the
+        backoff, by an empty PUT asking the session for its committed offset,
+        and sending resumes from there.
+        """
+        async def open_session():
+            headers = {
+                **self.auth_headers(),
+                'X-Upload-Content-Type': mimetype,
+                'X-Upload-Content-Length': str(file_size),
+            }
+            async with session.request(method, url, params={'uploadType': 'resumable', 'fields': 'id'},
+                                       json=file_metadata, headers=headers) as resp:
+                resp.raise_for_status()
+                return resp.headers['Location']
+        
+        session_uri = await self.call_with_resume_async(open_session)
+        
+        # Send the file in chunks; 308 means the server wants more
+        with open(file_path, 'rb') as f:
+            offset = 0
+            attempt = 0
+            query_offset = False
+            while True:
+                if query_offset:
+                    data = b''
+                else:
+                    f.seek(offset)
+                    data = await asyncio.to_thread(f.read, chunk_size)
+                end = offset + len(data)
+                content_range = f'bytes {offset}-{end - 1}/{file_size}' if data else f'bytes */{file_size}'
+                
+                try:
+                    async with session.put(session_uri, data=data, headers={'Content-Range': content_range},
+                                           allow_redirects=False) as resp:
+                        if resp.status == 308:
+                            # Resume from what the server actually stored
+                            stored = resp.headers.get('Range')
+                            stored_offset = int(stored.rsplit('-', 1)[1]) + 1 if stored else 0
+                            if stored_offset > offset:
+                                attempt = 0
+                            offset = stored_offset
+                            query_offset = False
+                            callback.set_completed(offset)
+                            continue
+                        resp.raise_for_status()
+                        return await resp.json(content_type=None)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == self.num_retries or not is_retriable(e):
+                        raise
+                    delay = retry_delay(e, attempt)
+                    attempt += 1
+                    self.console.print(f"⚠️  Request interrupted ({e}), retrying in {delay:.1f}s", style="yellow")
+                    await asyncio.sleep(delay)
+                    query_offset = True
+    
+    def transfer_upload(self, service, progress: ThrottledProgress, file_path: Path,
+                        parent_folder_id: Optional[str], chunk_size: Optional[int],
+                        existing_id: Optional[str] = None, deduplicate: bool = True) -> Optional[str]:
+        """Upload one file using the given service and shared progress display
+        
+        With existing_id the file's content replaces that Drive file.
+        """
         try:
-            file_path = Path(file_path)
             if not file_path.exists():
                 self.console.print(f"❌ File not found: {file_path}", style="red")
                 return None
             
             file_size = file_path.stat().st_size
             file_name = file_path.name
+            chunk_size = chunk_size or pick_chunk_size(file_size)
+            
+            # Skip the transfer if an identical file is already there
+            if deduplicate and not existing_id:
+                duplicate_id = self.find_duplicate(service, file_path, file_size, parent_folder_id)
+                if duplicate_id:
+                    self.console.print(f"⏭️  Already uploaded: {file_name} (ID: {duplicate_id})", style="yellow")
+                    return duplicate_id
             
             # File metadata
             file_metadata = {'name': file_name}
-            if parent_folder_id:
+            if parent_folder_id and not existing_id:
                 file_metadata['parents'] = [parent_folder_id]
             
-            # Set up progress tracking
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[bold blue]{task.fields[filename]}", justify="right"),
-                BarColumn(bar_width=None),
-                "[progress.percentage]{task.percentage:>3.1f}%",
-                "•",
-                FileSizeColumn(),
-                "•",
-                TransferSpeedColumn(),
-                "•",
-                TimeRemainingColumn(),
-                console=self.console,
-                transient=True,
-            ) as progress:
-                
-                task_id = progress.add_task(
-                    "upload",
-                    filename=file_name,
-                    total=file_size
-                )
-                
-                # Upload file
-                media = MediaFileUpload(
-                    str(file_path),
-                    chunksize=chunk_size,
-                    resumable=True
-                )
-                
-                request = self.service.files().create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields='id'
-                )
+            callback = progress.add_transfer(file_name, file_size)
+            
+            # Small files go up in a single request; large ones use the
+            # resumable protocol so interrupted chunks can be retried
+            resumable = file_size >= RESUMABLE_THRESHOLD
+            if file_size >= MMAP_UPLOAD_THRESHOLD:
+                media_class = MmapMediaUpload
+            elif resumable:
+                media_class = PrefetchMediaUpload
+            else:
+                media_class = MediaFileUpload
+            media = media_class(
+                str(file_path),
+                chunksize=chunk_size,
+                resumable=resumable
+            )
+            
+            try:
+                if existing_id:
+                    request = service.files().update(
+                        fileId=existing_id,
+                        body=file_metadata,
+                        media_body=media,
+                        fields='id'
+                    )
+                else:
+                    request = service.files().create(
+                        body=file_metadata,
+                        media_body=media,
+                        fields='id'
+                    )
                 
-                response = None
-                while response is None:
-                    status, response = request.next_chunk()
-                    if status:
-                        progress.update(
-                            task_id,
-                            completed=int(status.resumable_progress)
-                        )
+                if resumable:
+                    response = None
+                    while response is None:
+                        # call_with_resume is the only retry layer; a failed chunk
+                        # makes next_chunk query the session offset on the next try
+                        status, response = self.call_with_resume(request.next_chunk, num_retries=0)
+                        if status:
+                            callback.set_completed(int(status.resumable_progress))
+                else:
+                    response = self.call_with_resume(request.execute, num_retries=0)
+                    callback.set_completed(file_size)
+            finally:
+                if isinstance(media, (MmapMediaUpload, PrefetchMediaUpload)):
+                    media.close()
             
+            progress.finish_transfer(callback)
             file_id = response.get('id')
             self.console.print(f"✅ Uploaded: {file_name} (ID: {file_id})", style="green")
             return file_id
@@ -305,6 +1295,160 @@ class GoogleDriveManager:
             self.console.print(f"❌ Unexpected error: {e}", style="red")
             return None
     
+    def index_folders(self, folder_ids: List[str]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Map file names to metadata for each folder, following all pages
+        
+        First pages for all folders are fetched in batched requests; only
+        folders with more than one page need follow-up calls.
+        """
+        def folder_query(folder_id: str) -> str:
+            return f"'{folder_id}' in parents and trashed = false"
+        
+        indexes = {folder_id: {} for folder_id in folder_ids}
+        first_pages = self.execute_batch({
+            folder_id: self.service.files().list(
+                q=folder_query(folder_id),
+                pageSize=LIST_PAGE_SIZE,
+                fields=f"nextPageToken, files({INDEX_FIELDS})"
+            )
+            for folder_id in indexes
+        })
+        
+        for folder_id, results in first_pages.items():
+            if not results:
+                continue
+            pages = [results.get('files', [])]
+            if results.get('nextPageToken'):
+                pages = chain(pages, self.iter_pages(folder_query(folder_id), INDEX_FIELDS,
+                                                     results['nextPageToken']))
+            for files in pages:
+                for item in files:
+                    indexes[folder_id].setdefault(item['name'], item)
+        
+        return indexes
+    
+    def index_folder(self, folder_id: str) -> Dict[str, Dict[str, Any]]:
+        """Map file names in a folder to their metadata, following all pages"""
+        return self.index_folders([folder_id])[folder_id]
+    
+    def ensure_folder_tree(self, rel_dirs: List[str], root_folder_id: str) -> Dict[str, Optional[str]]:
+        """Map relative directory paths to Drive folder IDs under a root folder
+        
+        Works one depth level at a time: existing subfolders are found with one
+        batched listing of the level's parents, and missing ones are created
+        in batched requests. The root is keyed as '.'; folders that could not
+        be created map to None.
+        """
+        folder_ids: Dict[str, Optional[str]] = {'.': root_folder_id}
+        levels: Dict[int, List[str]] = {}
+        for rel_dir in sorted(set(rel_dirs) - {'.'}):
+            levels.setdefault(rel_dir.count('/'), []).append(rel_dir)
+        
+        for depth in sorted(levels):
+            dirs = [d for d in levels[depth] if folder_ids.get(Path(d).parent.as_posix())]
+            parent_ids = {folder_ids[Path(d).parent.as_posix()] for d in dirs}
+            existing = self.index_folders(sorted(parent_ids))
+            
+            requests = {}
+            for rel_dir in dirs:
+                parent_id = folder_ids[Path(rel_dir).parent.as_posix()]
+                name = Path(rel_dir).name
+                match = existing[parent_id].get(name)
+                if match and match.get('mimeType') == FOLDER_MIME_TYPE:
+                    folder_ids[rel_dir] = match['id']
+                else:
+                    requests[rel_dir] = self.service.files().create(
+                        body={'name': name, 'mimeType': FOLDER_MIME_TYPE, 'parents': [parent_id]},
+                        fields='id'
+                    )
+            
+            for rel_dir, result in self.execute_batch(requests).items():
+                folder_ids[rel_dir] = (result or {}).get('id')
+        
+        return folder_ids
+    
+    def plan_sync(self, targets: Dict[str, str]) -> Tuple[List[str], Dict[str, str], int]:
+        """Decide which local files a sync needs to send
+        
+        targets maps each local path to its destination folder ID. Each
+        destination is listed once; files whose size and MD5 match the remote
+        copy are skipped and changed files are marked for update in place.
+        Only files whose size matches are hashed, in parallel on the metadata
+        pool. Returns the paths to upload, a path → existing file ID map, and
+        the skipped count.
+        """
+        remote_indexes = self.index_folders(sorted(set(targets.values())))
+        to_upload, existing_ids, candidates = [], {}, {}
+        
+        for file_path, folder_id in targets.items():
+            remote = remote_indexes[folder_id].get(Path(file_path).name)
+            if remote and remote.get('mimeType') != FOLDER_MIME_TYPE:
+                if int(remote.get('size', -1)) == os.path.getsize(file_path):
+                    candidates[file_path] = remote
+                    continue
+                existing_ids[file_path] = remote['id']
+            to_upload.append(file_path)
+        
+        local_md5s = self.metadata_executor.map(compute_md5, map(Path, candidates))
+        skipped = 0
+        for (file_path, remote), md5 in zip(candidates.items(), local_md5s):
+            if remote.get('md5Checksum') == md5:
+                skipped += 1
+            else:
+                existing_ids[file_path] = remote['id']
+                to_upload.append(file_path)
+        
+        return to_upload, existing_ids, skipped
+    
+    def find_duplicate(self, service, file_path: Path, file_size: int,
+                       parent_folder_id: Optional[str]) -> Optional[str]:
+        """Find an existing Drive file with the same name, size and MD5
+        
+        Drive search cannot filter on md5Checksum, so candidates are matched
+        by name and folder first and the local file is only hashed when one
+        of them has the same size.
+        """
+        # Uploads without a parent land in My Drive's root, so only look there
+        query = [f"name = '{escape_query(file_path.name)}'", "trashed = false",
+                 f"'{parent_folder_id or 'root'}' in parents"]
+        
+        try:
+            candidates = self.execute(service.files().list(
+                q=" and ".join(query),
+                fields="files(id,size,md5Checksum)"
+            )).get('files', [])
+        except HttpError:
+            return None
+        
+        candidates = [f for f in candidates if int(f.get('size', -1)) == file_size]
+        if not candidates:
+            return None
+        
+        md5 = compute_md5(file_path)
+        for candidate in candidates:
+            if candidate.get('md5Checksum') == md5:
+                return candidate['id']
+        return None
+    
+    def run_transfers(self, worker: Callable[[str], Any], items: List[str],
+                      max_workers: int) -> List[Tuple[str, Any]]:
+        """Run a transfer worker over many items on a thread pool
+        
+        Submissions pass through the rate limiter so bursts stay within the
+        Drive per-user request quota.
+        """
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items) or 1))) as executor:
+            futures = {}
+            for item in items:
+                self.rate_limiter.acquire()
+                futures[executor.submit(worker, item)] = item
+            
+            for future in as_completed(futures):
+                results.append((futures[future], future.result()))
+        
+        return results
+    
     def create_folder(self, folder_name: str, parent_folder_id: str = None) -> Optional[str]:
         """Create folder in Google Drive"""
         if not self.authenticated:
@@ -314,16 +1458,16 @@ class GoogleDriveManager:
         try:
             file_metadata = {
                 'name': folder_name,
-                'mimeType': 'application/vnd.google-apps.folder'
+                'mimeType': FOLDER_MIME_TYPE
             }
             
             if parent_folder_id:
                 file_metadata['parents'] = [parent_folder_id]
             
-            folder = self.service.files().create(
+            folder = self.execute(self.service.files().create(
                 body=file_metadata,
                 fields='id'
-            ).execute()
+            ))
             
             folder_id = folder.get('id')
             self.console.print(f"✅ Created folder: {folder_name} (ID: {folder_id})", style="green")
@@ -333,6 +1477,36 @@ class GoogleDriveManager:
             self.console.print(f"❌ Failed to create folder: {e}", style="red")
             return None
     
+    def create_folders(self, folder_names: List[str], parent_folder_id: str = None) -> Dict[str, Optional[str]]:
+        """Create several folders in batched requests
+        
+        Returns a dict mapping each name to its new folder ID, or None on failure.
+        """
+        if not self.authenticated:
+            self.console.print("❌ Not authenticated", style="red")
+            return {name: None for name in folder_names}
+        
+        requests = {}
+        for name in folder_names:
+            file_metadata = {'name': name, 'mimeType': FOLDER_MIME_TYPE}
+            if parent_folder_id:
+                file_metadata['parents'] = [parent_folder_id]
+            requests[name] = self.service.files().create(body=file_metadata, fields='id')
+        
+        return {name: (result or {}).get('id') for name, result in self.execute_batch(requests).items()}
+    
+    def delete_files(self, file_ids: List[str]) -> Dict[str, bool]:
+        """Delete several files in batched requests
+        
+        Returns a dict mapping each file ID to whether it was deleted.
+        """
+        if not self.authenticated:
+            self.console.print("❌ Not authenticated", style="red")
+            return {file_id: False for file_id in file_ids}
+        
+        requests = {file_id: self.service.files().delete(fileId=file_id) for file_id in file_ids}
+        return {file_id: result is not None for file_id, result in self.execute_batch(requests).items()}
+    
     def delete_file(self, file_id: str) -> bool:
         """Delete file from Google Drive"""
         if not self.authenticated:
@@ -340,7 +1514,7 @@ class GoogleDriveManager:
             return False
         
         try:
-            self.service.files().delete(fileId=file_id).execute()
+            self.execute(self.service.files().delete(fileId=file_id))
             self.console.print(f"✅ Deleted file: {file_id}", style="green")
             return True
         except HttpError as e:
@@ -354,7 +1528,7 @@ class GoogleDriveManager:
             return {}
         
         try:
-            about = self.service.about().get(fields='storageQuota').execute()
+            about = self.execute(self.service.about().get(fields='storageQuota'))
             quota = about.get('storageQuota', {})
             
             return {
@@ -366,35 +1540,27 @@ class GoogleDriveManager:
         except HttpError as e:
             self.console.print(f"❌ Failed to get quota: {e}", style="red")
             return {}
-    
-    def display_files_table(self, files: List[Dict[str, Any]]):
-        """Display files in a formatted table"""
-        if not files:
-            self.console.print("No files found.", style="yellow")
-            return
-        
-        table = Table(title="Google Drive Files")
-        table.add_column("Name", style="cyan", no_wrap=True)
-        table.add_column("Size", style="magenta")
-        table.add_column("Type", style="green")
-        table.add_column("Modified", style="blue")
-        table.add_column("ID", style="dim")
-        
-        for file in files:
-            size = file.get('size', 'N/A')
-            if size != 'N/A':
-                size = f"{int(size):,} bytes"
-            
-            modified = file.get('modifiedTime', 'N/A')
-            if modified != 'N/A':
-                modified = modified.split('T')[0]  # Just the date
-            
-            table.add_row(
-                file['name'],
-                size,
-                file.get('mimeType', 'Unknown'),
-                modified,
-                file['id'][:20] + "..."
-            )
-        
-        self.console.print(table) 
\ No newline at end of file
+
+
+# Per-process state for upload_files_multiprocess workers
+_process_manager: Optional[GoogleDriveManager] = None
+_process_progress: Optional[ThrottledProgress] = None
+
+
+def _init_upload_process(credentials_file: str, token_file: str, num_retries: int):
+    """Build the worker process's manager from the saved token"""
+    global _process_manager, _process_progress
+    _process_manager = GoogleDriveManager(credentials_file, token_file, num_retries)
+    # The parent process reports results; keep workers from drawing over its display
+    _process_manager.console = Console(quiet=True)
+    _process_manager.authenticate()
+    _process_progress = ThrottledProgress(disable=True)
+
+
+def _upload_in_process(file_path: str, parent_folder_id: Optional[str],
+                       chunk_size: Optional[int], existing_id: Optional[str]) -> Optional[str]:
+    """Upload one file on the worker process's manager"""
+    if not _process_manager.authenticated:
+        return None
+    return _process_manager.transfer_upload(_process_manager.service, _process_progress, Path(file_path),
+                                            parent_folder_id, chunk_size, existing_id, deduplicate=False)
@@ -6,30 +6,239 @@ Command-line interface for Google Drive operations
 
 import os
 import sys
+import json
+import socket
+import socketserver
 from pathlib import Path
-from typing import Optional
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
 import click
 from rich.console import Console
-from rich.table import Table
-from rich.prompt import Prompt, Confirm
 
-from gdrive_manager import GoogleDriveManager
+# Heavier imports (gdrive_manager and the Google client libraries, rich
+# tables and prompts) are deferred to the commands that use them, so
+# --help and daemon-served commands start quickly
+from config import DAEMON_SOCKET, SYNC_WORKERS, NUM_RETRIES
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_dumps(data) -> str:
+    """Serialize data for --json output, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode()
+    return json.dumps(data, default=str)
 
 
 console = Console()
 
+# Per-directory file of gitignore-style patterns that sync leaves out
+DRIVEIGNORE_FILE = '.driveignore'
+
+# Byte units for human-readable sizes
+MiB = 1 << 20
+GiB = 1 << 30
+
+# Commands a daemon serves; each maps (manager, args) to a JSON-serializable result
+DAEMON_COMMANDS = {
+    'list': lambda manager, args: manager.list_files(
+        args.get('folder_id'), args.get('query'), args.get('max_results', 50)),
+    'download': lambda manager, args: manager.download_file(
+        args['file_id'], args['output_path'], args.get('chunk_size'), args.get('direct_io', False)),
+    'upload': lambda manager, args: manager.upload_file(
+        args['file_path'], args.get('folder_id'), args.get('chunk_size')),
+    'info': lambda manager, args: manager.get_file_info(args['file_id']),
+    'quota': lambda manager, args: manager.get_storage_quota(),
+}
+
+# In-process forms of daemon commands that stream their results instead of
+# returning them whole
+LOCAL_COMMANDS = {
+    'list': lambda manager, args: manager.iter_files(
+        args.get('folder_id'), args.get('query'), args.get('max_results', 50)),
+}
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Handle one JSON-line command against the daemon's manager"""
+    
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            handler = DAEMON_COMMANDS[request['command']]
+            response = {'ok': True, 'result': handler(self.server.manager, request.get('args', {}))}
+        except Exception as e:
+            response = {'ok': False, 'error': str(e)}
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+def send_to_daemon(command: str, **args) -> Optional[dict]:
+    """Send a command to a running daemon; returns None if none is listening"""
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(DAEMON_SOCKET):
+        return None
+    
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(DAEMON_SOCKET)
+            sock.sendall(json.dumps({'command': command, 'args': args}).encode() + b'\n')
+            with sock.makefile('rb') as f:
+                return json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+
+def dispatch(manager, command: str, **args):
+    """Run a command on the daemon if one is listening, otherwise in-process
+    
+    manager is None under --remote, where only the daemon may run commands.
+    """
+    response = send_to_daemon(command, **args)
+    if response is not None:
+        if not response.get('ok'):
+            console.print(f"❌ Daemon error: {response.get('error')}", style="red")
+            return None
+        return response.get('result')
+    
+    if manager is None:
+        console.print(f"❌ No daemon is listening on {DAEMON_SOCKET}", style="red")
+        return None
+    if not manager.authenticate():
+        return None
+    return LOCAL_COMMANDS.get(command, DAEMON_COMMANDS[command])(manager, args)
+
+
+def iter_file_rows(files: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, str, str, str, str]]:
+    """Yield (name, size, type, modified date, ID) display strings for files"""
+    for file in files:
+        size = file.get('size', 'N/A')
+        if size != 'N/A':
+            size = f"{int(size):,} bytes"
+        
+        modified = file.get('modifiedTime', 'N/A')
+        if modified != 'N/A':
+            modified = modified.split('T')[0]  # Just the date
+        
+        yield file['name'], size, file.get('mimeType', 'Unknown'), modified, file['id']
+
+
+def display_files_table(files: Iterable[Dict[str, Any]]):
+    """Display files in a formatted table as they arrive
+    
+    Rows are rendered progressively, so a paginated listing shows its
+    first page while later pages are still being fetched. When output is
+    not a terminal, files are written as tab-separated lines instead.
+    Needs no manager, so it also renders rows returned by a daemon.
+    """
+    rows = iter_file_rows(files)
+    
+    if not console.is_terminal:
+        for row in rows:
+            console.file.write('\t'.join(row) + '\n')
+        return
+    
+    first_row = next(rows, None)
+    if first_row is None:
+        console.print("No files found.", style="yellow")
+        return
+    
+    from rich.live import Live
+    from rich.table import Table
+    
+    table = Table(title="Google Drive Files")
+    table.add_column("Name", style="cyan", no_wrap=True)
+    table.add_column("Size", style="magenta")
+    table.add_column("Type", style="green")
+    table.add_column("Modified", style="blue")
+    table.add_column("ID", style="dim")
+    
+    with Live(table, console=console, refresh_per_second=4, vertical_overflow="visible"):
+        for name, size, mime_type, modified, file_id in chain([first_row], rows):
+            table.add_row(name, size, mime_type, modified, file_id[:20] + "...")
+
+
+def walk_files(root: str, skip_hidden: bool = False, skip_empty: bool = False,
+               ignore=None) -> Iterator[Tuple[str, str]]:
+    """Yield (file_path, relative_dir) string pairs for every regular file under root
+    
+    Uses os.scandir so entry types come from the directory listing instead
+    of a stat per entry. relative_dir is POSIX-style, '.' for root itself.
+    Symlinks, pipes, sockets and other non-regular entries are skipped, so
+    they never reach an upload worker. With skip_hidden, dot-entries and
+    __pycache__ directories are left out; with skip_empty, zero-byte files
+    are. ignore is a pathspec matched against root-relative paths.
+    """
+    stack = [(root, '.')]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if skip_hidden and (entry.name.startswith('.') or entry.name == '__pycache__'):
+                        continue
+                    rel_path = entry.name if rel_dir == '.' else f"{rel_dir}/{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        if not (ignore and ignore.match_file(rel_path + '/')):
+                            stack.append((entry.path, rel_path))
+                    elif entry.is_file(follow_symlinks=False):
+                        if ignore and ignore.match_file(rel_path):
+                            continue
+                        if skip_empty and entry.stat(follow_symlinks=False).st_size == 0:
+                            continue
+                        yield entry.path, rel_dir
+        except OSError as e:
+            console.print(f"❌ Cannot read {dir_path}: {e}", style="red")
+
+
+def load_driveignore(root: str):
+    """Load the gitignore-style patterns in root's .driveignore, if it has one"""
+    path = os.path.join(root, DRIVEIGNORE_FILE)
+    if not os.path.isfile(path):
+        return None
+    
+    import pathspec
+    
+    with open(path) as f:
+        return pathspec.PathSpec.from_lines('gitwildmatch', f)
+
 
 @click.group()
 @click.option('--credentials', '-c', default='credentials.json', 
               help='Path to Google Drive credentials file')
 @click.option('--token', '-t', default='token.json',
               help='Path to store authentication token')
+@click.option('--retries', default=NUM_RETRIES, type=int,
+              help='Times to resume an interrupted transfer before giving up')
+@click.option('--json', 'json_output', is_flag=True,
+              help='Print list, info and quota results as JSON instead of tables')
+@click.option('--remote', is_flag=True,
+              help='Only send the command to a running daemon; never authenticate locally')
 @click.pass_context
-def cli(ctx, credentials, token):
+def cli(ctx, credentials, token, retries, json_output, remote):
     """Google Drive CLI Tool with Live Progress Tracking"""
     ctx.ensure_object(dict)
-    ctx.obj['manager'] = GoogleDriveManager(credentials, token)
+    ctx.obj['json'] = json_output
+    
+    # Keep stdout clean for the JSON document; status messages go to stderr
+    if json_output:
+        console.stderr = True
+    
+    # A remote client never needs the Google libraries or a manager
+    if remote:
+        if ctx.invoked_subcommand not in DAEMON_COMMANDS:
+            console.print(f"❌ '{ctx.invoked_subcommand}' cannot run through the daemon", style="bold red")
+            sys.exit(1)
+        ctx.obj['manager'] = None
+        return
+    
+    from gdrive_manager import GoogleDriveManager
+    
+    ctx.obj['manager'] = GoogleDriveManager(credentials, token, retries)
+    if json_output:
+        ctx.obj['manager'].console.stderr = True
 
 
 @cli.command()
@@ -46,8 +255,8 @@ def auth(ctx):
         # Show storage quota
         quota = manager.get_storage_quota()
         if quota:
-            used_gb = quota['usage'] / (1024**3)
-            limit_gb = quota['limit'] / (1024**3)
+            used_gb = quota['usage'] / GiB
+            limit_gb = quota['limit'] / GiB
             percentage = (quota['usage'] / quota['limit']) * 100
             
             console.print(f"\n📊 Storage Usage: {used_gb:.2f} GB / {limit_gb:.2f} GB ({percentage:.1f}%)", 
@@ -66,21 +275,27 @@ def list(ctx, folder_id, query, max_results):
     """List files in Google Drive"""
     manager = ctx.obj['manager']
     
-    if not manager.authenticate():
-        return
+    if console.is_terminal:
+        console.print("📂 Listing Google Drive files...", style="bold blue")
     
-    console.print("📂 Listing Google Drive files...", style="bold blue")
+    # Rows are displayed as pages arrive
+    files = dispatch(manager, 'list', folder_id=folder_id, query=query, max_results=max_results)
+    if files is None:
+        return
     
-    files = manager.list_files(folder_id, query, max_results)
-    manager.display_files_table(files)
+    if ctx.obj['json']:
+        click.echo(json_dumps([*files]))
+        return
+    display_files_table(files)
 
 
 @cli.command()
 @click.argument('file_id')
 @click.argument('output_path')
-@click.option('--chunk-size', '-c', default=1048576, help='Download chunk size in bytes')
+@click.option('--chunk-size', '-c', type=int, help='Download chunk size in bytes (default: picked by file size)')
+@click.option('--odirect', is_flag=True, help='Write with O_DIRECT, bypassing the page cache (Linux)')
 @click.pass_context
-def download(ctx, file_id, output_path, chunk_size):
+def download(ctx, file_id, output_path, chunk_size, odirect):
     """Download file from Google Drive
     
     FILE_ID: Google Drive file ID
@@ -88,12 +303,14 @@ def download(ctx, file_id, output_path, chunk_size):
     """
     manager = ctx.obj['manager']
     
-    if not manager.authenticate():
-        return
+    if odirect and chunk_size and chunk_size % 4096:
+        console.print("❌ --chunk-size must be a multiple of 4096 with --odirect", style="bold red")
+        sys.exit(1)
     
     console.print(f"⬇️  Starting download: {file_id}", style="bold blue")
     
-    if manager.download_file(file_id, output_path, chunk_size):
+    if dispatch(manager, 'download', file_id=file_id,
+                output_path=os.path.abspath(output_path), chunk_size=chunk_size, direct_io=odirect):
         console.print("✅ Download completed successfully!", style="bold green")
     else:
         console.print("❌ Download failed!", style="bold red")
@@ -103,7 +320,7 @@ def download(ctx, file_id, output_path, chunk_size):
 @cli.command()
 @click.argument('file_path')
 @click.option('--folder-id', '-f', help='Parent folder ID (optional)')
-@click.option('--chunk-size', '-c', default=1048576, help='Upload chunk size in bytes')
+@click.option('--chunk-size', '-c', type=int, help='Upload chunk size in bytes (default: picked by file size)')
 @click.pass_context
 def upload(ctx, file_path, folder_id, chunk_size):
     """Upload file to Google Drive
@@ -112,12 +329,10 @@ def upload(ctx, file_path, folder_id, chunk_size):
     """
     manager = ctx.obj['manager']
     
-    if not manager.authenticate():
-        return
-    
     console.print(f"⬆️  Starting upload: {file_path}", style="bold blue")
     
-    file_id = manager.upload_file(file_path, folder_id, chunk_size)
+    file_id = dispatch(manager, 'upload', file_path=os.path.abspath(file_path),
+                       folder_id=folder_id, chunk_size=chunk_size)
     if file_id:
         console.print("✅ Upload completed successfully!", style="bold green")
         console.print(f"📄 File ID: {file_id}", style="cyan")
@@ -127,63 +342,88 @@ def upload(ctx, file_path, folder_id, chunk_size):
 
 
 @cli.command()
-@click.argument('folder_name')
+@click.argument('folder_names', nargs=-1, required=True)
 @click.option('--parent-id', '-p', help='Parent folder ID (optional)')
 @click.pass_context
-def mkdir(ctx, folder_name, parent_id):
-    """Create folder in Google Drive
+def mkdir(ctx, folder_names, parent_id):
+    """Create folders in Google Drive
     
-    FOLDER_NAME: Name of the folder to create
+    FOLDER_NAMES: Names of the folders to create
     """
     manager = ctx.obj['manager']
     
     if not manager.authenticate():
         return
     
-    console.print(f"📁 Creating folder: {folder_name}", style="bold blue")
+    if len(folder_names) == 1:
+        folder_name = folder_names[0]
+        console.print(f"📁 Creating folder: {folder_name}", style="bold blue")
+        
+        folder_id = manager.create_folder(folder_name, parent_id)
+        if folder_id:
+            console.print("✅ Folder created successfully!", style="bold green")
+            console.print(f"📁 Folder ID: {folder_id}", style="cyan")
+        else:
+            console.print("❌ Failed to create folder!", style="bold red")
+            sys.exit(1)
+        return
+    
+    console.print(f"📁 Creating {len(folder_names)} folders", style="bold blue")
     
-    folder_id = manager.create_folder(folder_name, parent_id)
-    if folder_id:
-        console.print("✅ Folder created successfully!", style="bold green")
-        console.print(f"📁 Folder ID: {folder_id}", style="cyan")
-    else:
-        console.print("❌ Failed to create folder!", style="bold red")
+    folder_ids = manager.create_folders(folder_names, parent_id)
+    for folder_name, folder_id in folder_ids.items():
+        if folder_id:
+            console.print(f"📁 {folder_name}: {folder_id}", style="cyan")
+        else:
+            console.print(f"❌ Failed to create folder: {folder_name}", style="red")
+    
+    if not all(folder_ids.values()):
         sys.exit(1)
+    console.print("✅ Folders created successfully!", style="bold green")
 
 
 @cli.command()
-@click.argument('file_id')
+@click.argument('file_ids', nargs=-1, required=True)
 @click.option('--confirm', '-y', is_flag=True, help='Skip confirmation prompt')
 @click.pass_context
-def delete(ctx, file_id, confirm):
-    """Delete file from Google Drive
+def delete(ctx, file_ids, confirm):
+    """Delete files from Google Drive
     
-    FILE_ID: Google Drive file ID to delete
+    FILE_IDS: Google Drive file IDs to delete
     """
+    from rich.prompt import Confirm
+    
     manager = ctx.obj['manager']
     
     if not manager.authenticate():
         return
     
-    # Get file info first
-    file_info = manager.get_file_info(file_id)
-    if not file_info:
-        console.print("❌ File not found!", style="bold red")
+    # Get file info first, in one batched round trip
+    file_infos = manager.get_file_infos(file_ids)
+    missing = [file_id for file_id, info in file_infos.items() if not info]
+    if missing:
+        console.print(f"❌ File not found: {', '.join(missing)}", style="bold red")
         return
     
-    file_name = file_info['name']
+    file_names = ', '.join(info['name'] for info in file_infos.values())
     
     if not confirm:
-        if not Confirm.ask(f"Are you sure you want to delete '{file_name}'?"):
+        if not Confirm.ask(f"Are you sure you want to delete '{file_names}'?"):
             console.print("❌ Deletion cancelled.", style="yellow")
             return
     
-    console.print(f"🗑️  Deleting file: {file_name}", style="bold blue")
+    console.print(f"🗑️  Deleting: {file_names}", style="bold blue")
     
-    if manager.delete_file(file_id):
-        console.print("✅ File deleted successfully!", style="bold green")
+    if len(file_ids) == 1:
+        deleted = {file_ids[0]: manager.delete_file(file_ids[0])}
     else:
-        console.print("❌ Failed to delete file!", style="bold red")
+        deleted = manager.delete_files(list(file_ids))
+    
+    if all(deleted.values()):
+        console.print("✅ Deleted successfully!", style="bold green")
+    else:
+        failed = [file_infos[file_id]['name'] for file_id, ok in deleted.items() if not ok]
+        console.print(f"❌ Failed to delete: {', '.join(failed)}", style="bold red")
         sys.exit(1)
 
 
@@ -195,16 +435,19 @@ def info(ctx, file_id):
     
     FILE_ID: Google Drive file ID
     """
-    manager = ctx.obj['manager']
+    from rich.table import Table
     
-    if not manager.authenticate():
-        return
+    manager = ctx.obj['manager']
     
-    file_info = manager.get_file_info(file_id)
+    file_info = dispatch(manager, 'info', file_id=file_id)
     if not file_info:
         console.print("❌ File not found!", style="bold red")
         return
     
+    if ctx.obj['json']:
+        click.echo(json_dumps(file_info))
+        return
+    
     # Display file information
     table = Table(title=f"File Information: {file_info['name']}")
     table.add_column("Property", style="cyan")
@@ -212,7 +455,8 @@ def info(ctx, file_id):
     
     for key, value in file_info.items():
         if key == 'size' and value:
-            value = f"{int(value):,} bytes ({int(value)/(1024**2):.2f} MB)"
+            size = int(value)
+            value = f"{size:,} bytes ({size / MiB:.2f} MB)"
         table.add_row(key, str(value))
     
     console.print(table)
@@ -222,21 +466,24 @@ def info(ctx, file_id):
 @click.pass_context
 def quota(ctx):
     """Show Google Drive storage quota"""
-    manager = ctx.obj['manager']
+    from rich.table import Table
     
-    if not manager.authenticate():
-        return
+    manager = ctx.obj['manager']
     
-    quota = manager.get_storage_quota()
+    quota = dispatch(manager, 'quota')
     if not quota:
         console.print("❌ Failed to get quota information!", style="bold red")
         return
     
+    if ctx.obj['json']:
+        click.echo(json_dumps(quota))
+        return
+    
     # Convert to human readable
-    total_gb = quota['limit'] / (1024**3)
-    used_gb = quota['usage'] / (1024**3)
-    drive_gb = quota['usageInDrive'] / (1024**3)
-    trash_gb = quota['usageInDriveTrash'] / (1024**3)
+    total_gb = quota['limit'] / GiB
+    used_gb = quota['usage'] / GiB
+    drive_gb = quota['usageInDrive'] / GiB
+    trash_gb = quota['usageInDriveTrash'] / GiB
     free_gb = total_gb - used_gb
     percentage = (quota['usage'] / quota['limit']) * 100
     
@@ -258,9 +505,16 @@ def quota(ctx):
 @click.argument('source_path')
 @click.argument('dest_folder_id')
 @click.option('--recursive', '-r', is_flag=True, help='Upload folders recursively')
-@click.option('--chunk-size', '-c', default=1048576, help='Upload chunk size in bytes')
+@click.option('--chunk-size', '-c', type=int, help='Upload chunk size in bytes (default: picked by file size)')
+@click.option('--workers', '-w', default=SYNC_WORKERS, help='Number of concurrent uploads')
+@click.option('--async-io', is_flag=True, help='Run uploads on one asyncio event loop instead of threads')
+@click.option('--backend', type=click.Choice(['thread', 'process']), default='thread',
+              help='Run uploads on worker threads or worker processes')
+@click.option('--skip-hidden', is_flag=True, help='Skip dotfiles, dot-directories and __pycache__')
+@click.option('--skip-empty', is_flag=True, help='Skip zero-byte files')
 @click.pass_context
-def sync(ctx, source_path, dest_folder_id, recursive, chunk_size):
+def sync(ctx, source_path, dest_folder_id, recursive, chunk_size, workers, async_io, backend,
+         skip_hidden, skip_empty):
     """Sync local directory to Google Drive folder
     
     SOURCE_PATH: Local directory path
@@ -290,23 +544,81 @@ def sync(ctx, source_path, dest_folder_id, recursive, chunk_size):
             console.print("❌ Use --recursive flag to sync directories", style="bold red")
             return
         
-        # Upload directory recursively
-        uploaded_count = 0
-        failed_count = 0
+        # Mirror the directory tree with batched folder creation, compare
+        # against one listing per destination folder, then upload new and
+        # changed files on a bounded pool of workers
+        files = [*walk_files(str(source_path), skip_hidden, skip_empty,
+                             load_driveignore(str(source_path)))]
+        rel_dirs = {rel_dir for _, rel_dir in files}
+        rel_dirs |= {parent.as_posix() for d in rel_dirs for parent in Path(d).parents}
+        folder_ids = manager.ensure_folder_tree(sorted(rel_dirs), dest_folder_id)
+        
+        targets = {}
+        unplaced_count = 0
+        for file_path, rel_dir in files:
+            folder_id = folder_ids.get(rel_dir)
+            if folder_id:
+                targets[file_path] = folder_id
+            else:
+                unplaced_count += 1
         
-        for file_path in source_path.rglob('*'):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(source_path)
-                console.print(f"📄 Uploading: {relative_path}", style="blue")
-                
-                file_id = manager.upload_file(str(file_path), dest_folder_id, chunk_size)
-                if file_id:
-                    uploaded_count += 1
-                else:
-                    failed_count += 1
+        files, existing_ids, skipped_count = manager.plan_sync(targets)
+        console.print(f"📄 Uploading {len(files)} files with {workers} workers "
+                      f"({skipped_count} unchanged)", style="blue")
         
-        console.print(f"✅ Sync completed: {uploaded_count} uploaded, {failed_count} failed", 
-                     style="bold green")
+        if async_io:
+            import asyncio
+            results = asyncio.run(manager.upload_files_async(
+                files, dest_folder_id, chunk_size, concurrency=workers,
+                existing_ids=existing_ids, parent_ids=targets))
+        elif backend == 'process':
+            results = manager.upload_files_multiprocess(files, dest_folder_id, chunk_size, max_workers=workers,
+                                                        existing_ids=existing_ids, parent_ids=targets)
+        else:
+            results = manager.upload_files(files, dest_folder_id, chunk_size, max_workers=workers,
+                                           existing_ids=existing_ids, deduplicate=False,
+                                           parent_ids=targets)
+        uploaded_count = sum(1 for _, file_id in results if file_id)
+        failed_count = len(results) - uploaded_count + unplaced_count
+        
+        console.print(f"✅ Sync completed: {uploaded_count} uploaded, {skipped_count} unchanged, "
+                      f"{failed_count} failed", style="bold green")
+
+
+@cli.command()
+@click.pass_context
+def daemon(ctx):
+    """Keep an authenticated session alive for list, download, upload, info and quota
+    
+    Those commands send their work to the daemon over a UNIX socket while it
+    runs, skipping authentication and service setup on every invocation.
+    """
+    manager = ctx.obj['manager']
+    
+    if not hasattr(socket, 'AF_UNIX'):
+        console.print("❌ Daemon mode needs UNIX socket support", style="bold red")
+        sys.exit(1)
+    
+    if not manager.authenticate():
+        sys.exit(1)
+    
+    socket_path = Path(DAEMON_SOCKET)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        socket_path.unlink()
+    
+    with socketserver.UnixStreamServer(str(socket_path), DaemonRequestHandler) as server:
+        server.manager = manager
+        console.print(f"🚀 Daemon listening on {socket_path} (Ctrl+C to stop)", style="bold green")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            console.print("\n👋 Daemon stopped", style="yellow")
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+cli.add_command(daemon, name='serve')
 
 
 if __name__ == '__main__':
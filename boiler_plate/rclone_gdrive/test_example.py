@@ -11,6 +11,7 @@ from rich.console import Console
 from rich.panel import Panel
 
 from gdrive_manager import GoogleDriveManager
+from main import display_files_table
 
 console = Console()
 
@@ -72,7 +73,7 @@ def main():
     files = manager.list_files(max_results=5)
     if files:
         console.print(f"✅ Found {len(files)} files")
-        manager.display_files_table(files[:3])  # Show first 3 files
+        display_files_table(files[:3])  # Show first 3 files
     else:
         console.print("⚠️  No files found or listing failed")
     
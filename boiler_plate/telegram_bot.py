@@ -20,14 +20,45 @@ Usage:
 """
 
 import os
+import sys
 import asyncio
 import time
 import logging
-from typing import Callable, Dict, Any, Optional
+import itertools
+import re
+import signal
+import weakref
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, Any, Optional, Tuple, Union
 from telegram import Update, BotCommand, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import RetryAfter
+from telegram.request import HTTPXRequest
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, CallbackQueryHandler
 from dotenv import load_dotenv
 
+# uvloop is optional; without it the stock asyncio loop is used
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# HTTP/2 needs the h2 package (httpx[http2]); without it requests use HTTP/1.1
+try:
+    import h2
+    HTTP_VERSION = "2"
+except ImportError:
+    HTTP_VERSION = "1.1"
+
+# aiofiles is optional; without it file I/O runs on the default thread pool
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
 # Load environment variables
 load_dotenv()
 
@@ -38,9 +69,91 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+BOT_TOKEN_PATTERN = re.compile(r"^\d+:[A-Za-z0-9_-]{35}$")
+
+def save_env_var(key: str, value: str, env_path: str = '.env'):
+    """Set key in an env file, replacing any earlier entries, via an atomic rename."""
+    try:
+        with open(env_path, 'r', encoding='utf-8') as f:
+            lines = [line for line in f.read().splitlines() if not line.startswith(f"{key}=")]
+    except FileNotFoundError:
+        lines = []
+    lines.append(f"{key}={value}")
+    
+    tmp_path = f"{env_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, env_path)
+
+# Longest exception text echoed back to a user; the full error goes to the log
+MAX_ERROR_CHARS = 200
+
+def error_text(label: str, e: Exception) -> str:
+    """Format a short user-facing error message."""
+    return f"❌ {label}: {str(e)[:MAX_ERROR_CHARS]}"
+
+def install_uvloop() -> bool:
+    """Run asyncio on uvloop if it is installed. Returns whether it was installed."""
+    if uvloop is None:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+async def read_file(file_path: str) -> bytes:
+    """Read a file's bytes without blocking the event loop."""
+    if aiofiles is not None:
+        async with aiofiles.open(file_path, 'rb') as f:
+            return await f.read()
+    return await asyncio.to_thread(_read_bytes, file_path)
+
+async def write_text_file(file_path: str, text: str, mode: str = 'w'):
+    """Write text to a file without blocking the event loop."""
+    if aiofiles is not None:
+        async with aiofiles.open(file_path, mode, encoding='utf-8') as f:
+            await f.write(text)
+    else:
+        await asyncio.to_thread(_write_text, file_path, text, mode)
+
+def _read_bytes(file_path: str) -> bytes:
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+def _write_text(file_path: str, text: str, mode: str = 'w'):
+    with open(file_path, mode, encoding='utf-8') as f:
+        f.write(text)
+
+def remove_file(file_path: str, prune_parent: bool = False):
+    """Delete a sent file, and its directory too if that leaves it empty.
+    
+    Blocking; call it through asyncio.to_thread from handlers.
+    """
+    try:
+        os.remove(file_path)
+        if prune_parent:
+            parent_dir = os.path.dirname(file_path) or '.'
+            # Stop at the first entry instead of listing the whole directory
+            with os.scandir(parent_dir) as entries:
+                empty = next(entries, None) is None
+            if empty:
+                os.rmdir(parent_dir)
+    except OSError:
+        pass
+
 class ProgressBar:
     """Advanced progress bar utility for Telegram messages."""
     
+    # Exclusive upper bounds (in percent) of each emoji stage; the first one
+    # separates exactly 0% from any progress at all
+    STAGE_CUTOFFS = (sys.float_info.min, 25, 50, 75, 100)
+    STAGES = (
+        ("⭕", "Starting"),
+        ("🔴", "Beginning"),
+        ("🟠", "In Progress"),
+        ("🟡", "Halfway"),
+        ("🔵", "Almost Done"),
+        ("🟢", "Complete"),
+    )
+    
     def __init__(self, total: int = 100, length: int = 20, fill: str = "█", empty: str = "░", 
                  show_percentage: bool = True, show_count: bool = True):
         self.total = total
@@ -50,15 +163,16 @@ class ProgressBar:
         self.show_percentage = show_percentage
         self.show_count = show_count
         self.current = 0
-        self.start_time = time.time()
+        self.start_time_ns = time.monotonic_ns()
+        
+        # Every possible bar, indexed by filled length
+        self.bars = [fill * i + empty * (length - i) for i in range(length + 1)]
         
     def update(self, current: int) -> str:
         """Update progress and return formatted progress bar string."""
         self.current = min(current, self.total)
         percent = (self.current / self.total) * 100
-        filled_length = int(self.length * self.current // self.total)
-        
-        bar = self.fill * filled_length + self.empty * (self.length - filled_length)
+        bar = self.bars[int(self.length * self.current // self.total)]
         
         # Build progress string
         progress_parts = [f"[{bar}]"]
@@ -75,30 +189,22 @@ class ProgressBar:
         """Get emoji-based progress indicator with status."""
         self.current = min(current, self.total)
         percent = (self.current / self.total) * 100
+        emoji, status = self.STAGES[bisect_right(self.STAGE_CUTOFFS, percent)]
         
-        if percent == 0:
-            emoji, status = "⭕", "Starting"
-        elif percent < 25:
-            emoji, status = "🔴", "Beginning"
-        elif percent < 50:
-            emoji, status = "🟠", "In Progress"
-        elif percent < 75:
-            emoji, status = "🟡", "Halfway"
-        elif percent < 100:
-            emoji, status = "🔵", "Almost Done"
-        else:
-            emoji, status = "🟢", "Complete"
-            
         return f"{emoji} {percent:.1f}% {status}"
     
-    def get_eta(self, current: int) -> str:
-        """Calculate and return estimated time remaining."""
+    def get_eta(self, current: int, now_ns: Optional[int] = None) -> str:
+        """Calculate and return estimated time remaining.
+        
+        Pass now_ns (from time.monotonic_ns) to reuse a timestamp the caller
+        already took this tick.
+        """
         if current <= 0:
             return "Calculating..."
             
-        elapsed = time.time() - self.start_time
-        rate = current / elapsed
-        remaining = (self.total - current) / rate if rate > 0 else 0
+        elapsed_ns = (now_ns or time.monotonic_ns()) - self.start_time_ns
+        remaining_ns = max(self.total - current, 0) * elapsed_ns // current
+        remaining = remaining_ns / 1e9
         
         if remaining < 60:
             return f"{remaining:.0f}s"
@@ -107,116 +213,166 @@ class ProgressBar:
         else:
             return f"{remaining/3600:.1f}h"
 
+class RateLimiter:
+    """Async limiter for Telegram's global and per-chat message rates.
+    
+    Each send reserves the next free slot on both the global and the chat's
+    schedule and sleeps until it arrives. A RetryAfter from Telegram halts
+    every send for the requested time.
+    """
+    
+    def __init__(self, global_rate: float = 30, per_chat_rate: float = 1, max_chats: int = 1000):
+        self.global_interval = 1 / global_rate
+        self.chat_interval = 1 / per_chat_rate
+        self.max_chats = max_chats
+        self.global_next = 0.0
+        self.chat_next: Dict[int, float] = {}
+        self.halted_until = 0.0
+        self.lock = asyncio.Lock()
+    
+    def ready(self, chat_id: int) -> bool:
+        """Whether a send to this chat could go out without waiting."""
+        now = time.monotonic()
+        return max(self.halted_until, self.global_next, self.chat_next.get(chat_id, 0)) <= now
+    
+    def halt(self, seconds: float):
+        """Hold all sends for the given number of seconds."""
+        self.halted_until = max(self.halted_until, time.monotonic() + seconds)
+    
+    @asynccontextmanager
+    async def acquire(self, chat_id: int):
+        """Wait for a send slot for this chat, halting on RetryAfter."""
+        async with self.lock:
+            now = time.monotonic()
+            start = max(now, self.halted_until, self.global_next, self.chat_next.get(chat_id, 0))
+            self.global_next = start + self.global_interval
+            self.chat_next[chat_id] = start + self.chat_interval
+            
+            # Forget chats whose slots are long past
+            if len(self.chat_next) > self.max_chats:
+                self.chat_next = {cid: t for cid, t in self.chat_next.items() if t > now}
+        
+        if start > now:
+            await asyncio.sleep(start - now)
+        try:
+            yield
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            if isinstance(retry_after, timedelta):
+                retry_after = retry_after.total_seconds()
+            logger.warning("Rate limited by Telegram, pausing sends for %ss", retry_after)
+            self.halt(retry_after)
+            raise
+
+@dataclass(slots=True, frozen=True)
+class TextResponse:
+    """Plain text reply."""
+    content: str
+
+@dataclass(slots=True, frozen=True)
+class StyledTextResponse:
+    """Text reply rendered with a parse mode."""
+    content: str
+    parse_mode: str = "Markdown"
+
+@dataclass(slots=True, frozen=True)
+class ProgressResponse:
+    """Progress bar that ends with a completion message."""
+    title: str
+    content: str
+    total_steps: int = 100
+    step_delay: float = 0.3
+
+@dataclass(slots=True, frozen=True)
+class KeyboardResponse:
+    """Text reply with inline buttons, as rows of (text, callback_data) pairs."""
+    content: str
+    buttons: Tuple[Tuple[Tuple[str, str], ...], ...]
+    parse_mode: str = "Markdown"
+
+@dataclass(slots=True, frozen=True)
+class FileResponse:
+    """Document reply, optionally created from file_content first."""
+    file_path: str
+    content: str = ""
+    file_content: Optional[str] = None
+    cleanup: bool = True
+
+Response = Union[TextResponse, StyledTextResponse, ProgressResponse, KeyboardResponse, FileResponse]
+
 class TelegramBotResponse:
     """Helper class for creating bot responses."""
     
     @staticmethod
-    def text(content: str) -> Dict[str, Any]:
+    def text(content: str) -> TextResponse:
         """Create a simple text response."""
-        return {"type": "text", "content": content}
+        return TextResponse(content)
     
     @staticmethod
-    def styled_text(content: str, parse_mode: str = "Markdown") -> Dict[str, Any]:
+    def styled_text(content: str, parse_mode: str = "Markdown") -> StyledTextResponse:
         """Create a styled text response with formatting."""
-        return {"type": "styled_text", "content": content, "parse_mode": parse_mode}
+        return StyledTextResponse(content, parse_mode)
     
     @staticmethod
     def progress(title: str, final_message: str, total_steps: int = 100, 
-                step_delay: float = 0.3) -> Dict[str, Any]:
+                step_delay: float = 0.3) -> ProgressResponse:
         """Create a progress bar response."""
-        return {
-            "type": "progress",
-            "content": final_message,
-            "progress_config": {
-                "total_steps": total_steps,
-                "step_delay": step_delay,
-                "title": title
-            }
-        }
+        return ProgressResponse(title, final_message, total_steps, step_delay)
     
     @staticmethod
-    def keyboard(content: str, buttons: list, parse_mode: str = "Markdown") -> Dict[str, Any]:
-        """Create an inline keyboard response."""
-        return {
-            "type": "inline_keyboard",
-            "content": content,
-            "parse_mode": parse_mode,
-            "keyboard": buttons
-        }
+    def keyboard(content: str, buttons: list, parse_mode: str = "Markdown") -> KeyboardResponse:
+        """Create an inline keyboard response.
+        
+        Buttons may be {"text", "callback_data"} dicts or (text, callback_data) pairs.
+        """
+        rows = tuple(
+            tuple((b["text"], b["callback_data"]) if isinstance(b, dict) else tuple(b) for b in row)
+            for row in buttons
+        )
+        return KeyboardResponse(content, rows, parse_mode)
     
     @staticmethod
     def file(file_path: str, content: str = "", file_content: str = None, 
-            cleanup: bool = True) -> Dict[str, Any]:
+            cleanup: bool = True) -> FileResponse:
         """Create a file response."""
-        response = {
-            "type": "file",
-            "file_path": file_path,
-            "content": content,
-            "cleanup": cleanup
-        }
-        if file_content:
-            response["file_content"] = file_content
-        return response
+        return FileResponse(file_path, content, file_content or None, cleanup)
     
     @staticmethod
-    def error(message: str = "An error occurred. Please try again.") -> Dict[str, Any]:
+    def error(message: str = "An error occurred. Please try again.") -> TextResponse:
         """Create an error response."""
-        return {"type": "text", "content": f"❌ {message}"}
-
-class TelegramBot:
-    """Complete Telegram Bot with all functionality built-in."""
+        return TextResponse(f"❌ {message}")
     
-    def __init__(self, bot_token: str, user_handler: Callable, 
-                 bot_name: str = "Enhanced Bot", bot_description: str = "Powered by Progress Tracking"):
-        """
-        Initialize the Telegram bot.
-        
-        Args:
-            bot_token: Your Telegram bot token
-            user_handler: Function to handle user requests (message_text, callback_data, progress_callback)
-            bot_name: Name of your bot
-            bot_description: Description for help text
-        """
-        self.bot_token = bot_token
-        self.user_handler = user_handler
-        self.bot_name = bot_name
-        self.bot_description = bot_description
-        self.application = None
-        self.response = TelegramBotResponse()
-        
-        # Store active progress operations
-        self.active_progress = {}
-        
-    def create_progress_callback(self, message_obj, operation_id: str):
-        """Create a progress callback for real-time updates."""
-        async def progress_callback(current: int, total: int, status: str = "Processing"):
-            try:
-                if operation_id not in self.active_progress:
-                    self.active_progress[operation_id] = ProgressBar(total=total)
-                
-                progress_bar = self.active_progress[operation_id]
-                progress_text = progress_bar.update(current)
-                emoji_progress = progress_bar.get_emoji_progress(current)
-                eta = progress_bar.get_eta(current)
-                
-                full_text = f"🔄 **{status}**\n\n{progress_text}\n{emoji_progress}\nETA: {eta}"
-                
-                await message_obj.edit_text(full_text, parse_mode='Markdown')
-                
-                if current >= total:
-                    if operation_id in self.active_progress:
-                        del self.active_progress[operation_id]
-                        
-            except Exception as e:
-                logger.error(f"Progress callback error: {e}")
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> Response:
+        """Convert a dict in the older {"type": ...} format to a response."""
+        response_type = data.get("type", "text")
+        content = data.get("content", "")
         
-        return progress_callback
+        if response_type == "styled_text":
+            return StyledTextResponse(content, data.get("parse_mode", "Markdown"))
+        if response_type == "inline_keyboard":
+            return TelegramBotResponse.keyboard(content, data.get("keyboard", []), data.get("parse_mode", "Markdown"))
+        if response_type == "progress":
+            config = data.get("progress_config", {})
+            return ProgressResponse(
+                config.get("title", "Processing"),
+                data.get("content", "Operation finished!"),
+                config.get("total_steps", 100),
+                config.get("step_delay", 0.3)
+            )
+        if response_type == "file":
+            return FileResponse(
+                data.get("file_path", "temp.txt"),
+                content,
+                data.get("file_content"),
+                data.get("cleanup", True)
+            )
+        return TextResponse(content)
 
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /start command."""
-        welcome_text = f"""👋 **Welcome to {self.bot_name}!**
+# Command replies; the bot's name and description are filled in once per bot
+WELCOME_TEMPLATE = """👋 **Welcome to {bot_name}!**
 
-{self.bot_description}
+{bot_description}
 
 🚀 **Features:**
 • 📊 Real-time progress tracking
@@ -231,12 +387,8 @@ class TelegramBot:
 • Send commands or text to see responses
 
 ✨ Ready to serve you!"""
-        
-        await update.message.reply_text(welcome_text, parse_mode='Markdown')
 
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /help command."""
-        help_text = f"""🤖 **{self.bot_name} Help**
+HELP_TEMPLATE = """🤖 **{bot_name} Help**
 
 **Available Commands:**
 • `/start` - Welcome message
@@ -269,19 +421,12 @@ class TelegramBot:
 • Check `/status` for bot information
 
 🔧 **Powered by:** Advanced Telegram Bot Framework"""
-        
-        await update.message.reply_text(help_text, parse_mode='Markdown')
 
-    async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /status command."""
-        active_operations = len(self.active_progress)
-        uptime = time.time() - getattr(self, 'start_time', time.time())
-        
-        status_text = f"""📊 **{self.bot_name} Status**
+STATUS_TEMPLATE = """📊 **{bot_name} Status**
 
 🟢 **Status:** Online and Running
-⏱️ **Uptime:** {uptime/3600:.1f} hours
-🔄 **Active Operations:** {active_operations}
+⏱️ **Uptime:** {uptime:.1f} hours
+🔄 **Active Operations:** {active_ops}
 💾 **Memory Usage:** Optimized
 🚀 **Performance:** Excellent
 
@@ -293,34 +438,153 @@ class TelegramBot:
 • Logging: ✅ Comprehensive
 
 ✅ All systems operational!"""
+
+class TelegramBot:
+    """Complete Telegram Bot with all functionality built-in."""
+    
+    # Progress bars kept for handlers that never report completion
+    MAX_ACTIVE_PROGRESS = 1024
+    # Updates processed at once, and how many of those may run the user handler
+    MAX_CONCURRENT_UPDATES = 256
+    MAX_CONCURRENT_HANDLERS = 64
+    # Bot API connections for sends/edits, and for the long-polling getUpdates
+    CONNECTION_POOL_SIZE = 256
+    POLLING_POOL_SIZE = 8
+    # Percentages at which progress responses draw a frame: dense early, sparse later
+    PROGRESS_FRAMES = (0, 1, 2, 4, 8, 16, 32, 50, 66, 83)
+    
+    def __init__(self, bot_token: str, user_handler: Callable, 
+                 bot_name: str = "Enhanced Bot", bot_description: str = "Powered by Progress Tracking"):
+        """
+        Initialize the Telegram bot.
+        
+        Args:
+            bot_token: Your Telegram bot token
+            user_handler: Function to handle user requests (message_text, callback_data, progress_callback)
+            bot_name: Name of your bot
+            bot_description: Description for help text
+        """
+        self.bot_token = bot_token
+        self.user_handler = user_handler
+        
+        # Decide once whether the handler needs awaiting
+        if asyncio.iscoroutinefunction(user_handler):
+            self._invoke_user_handler = user_handler
+        else:
+            async def invoke_sync_handler(*args):
+                return user_handler(*args)
+            self._invoke_user_handler = invoke_sync_handler
+        self.bot_name = bot_name
+        self.bot_description = bot_description
+        self.application = None
+        self.response = TelegramBotResponse()
+        self.rate_limiter = RateLimiter()
+        
+        # Store active progress operations
+        self.active_progress: OrderedDict[int, ProgressBar] = OrderedDict()
+        self._op_counter = itertools.count(1)
+        
+        # Bound user handler concurrency overall, and run one at a time per chat.
+        # Chat locks live only while some update from that chat holds a reference.
+        self._handler_sem = asyncio.Semaphore(self.MAX_CONCURRENT_HANDLERS)
+        self._chat_locks: weakref.WeakValueDictionary[int, asyncio.Lock] = weakref.WeakValueDictionary()
+        
+        # Only the status reply changes between sends; format the rest once
+        self._welcome_text = sys.intern(WELCOME_TEMPLATE.format(bot_name=bot_name, bot_description=bot_description))
+        self._help_text = sys.intern(HELP_TEMPLATE.format(bot_name=bot_name))
+        escaped_name = bot_name.replace("{", "{{").replace("}", "}}")
+        self._status_template = STATUS_TEMPLATE.replace("{bot_name}", escaped_name)
         
+    def create_progress_callback(self, message_obj, operation_id: int):
+        """Create a progress callback for real-time updates."""
+        async def progress_callback(current: int, total: int, status: str = "Processing"):
+            try:
+                if operation_id not in self.active_progress:
+                    self.active_progress[operation_id] = ProgressBar(total=total)
+                    if len(self.active_progress) > self.MAX_ACTIVE_PROGRESS:
+                        self.active_progress.popitem(last=False)
+                
+                progress_bar = self.active_progress[operation_id]
+                progress_text = progress_bar.update(current)
+                emoji_progress = progress_bar.get_emoji_progress(current)
+                eta = progress_bar.get_eta(current)
+                
+                full_text = f"🔄 **{status}**\n\n{progress_text}\n{emoji_progress}\nETA: {eta}"
+                
+                await self.edit_throttled(message_obj.edit_text, message_obj.chat_id, full_text,
+                                          parse_mode='Markdown', force=current >= total)
+                
+                if current >= total:
+                    self.active_progress.pop(operation_id, None)
+                        
+            except Exception as e:
+                logger.error("Progress callback error: %s", e, exc_info=True)
+        
+        return progress_callback
+
+    async def edit_throttled(self, edit: Callable, chat_id: int, text: str,
+                             parse_mode: Optional[str] = None, force: bool = False) -> bool:
+        """Send a message edit through the rate limiter.
+        
+        Unless force is set, the edit is dropped when the chat has no free
+        slot, so fast progress frames coalesce instead of queueing up. After
+        a RetryAfter the edit is retried once the limiter's halt has passed.
+        Returns whether the edit was sent.
+        """
+        if not force and not self.rate_limiter.ready(chat_id):
+            return False
+        
+        for _ in range(3):
+            try:
+                async with self.rate_limiter.acquire(chat_id):
+                    await edit(text, parse_mode=parse_mode)
+                return True
+            except RetryAfter:
+                continue
+        return False
+
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /start command."""
+        await update.message.reply_text(self._welcome_text, parse_mode='Markdown')
+
+    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /help command."""
+        await update.message.reply_text(self._help_text, parse_mode='Markdown')
+
+    async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /status command."""
+        uptime = time.time() - getattr(self, 'start_time', time.time())
+        status_text = self._status_template.format(uptime=uptime / 3600, active_ops=len(self.active_progress))
         await update.message.reply_text(status_text, parse_mode='Markdown')
 
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle text messages by calling user handler."""
         try:
             message_text = update.message.text
-            chat_id = update.effective_chat.id
-            operation_id = f"{chat_id}_{int(time.time())}"
+            operation_id = next(self._op_counter)
             
             # Create progress callback for this operation
             temp_message = await update.message.reply_text("🔄 Processing...")
             progress_callback = self.create_progress_callback(temp_message, operation_id)
             
             # Call user handler
-            response_data = await self.call_user_handler(
-                message_text=message_text,
-                callback_data=None,
-                progress_callback=progress_callback
-            )
+            try:
+                response_data = await self.call_user_handler(
+                    message_text=message_text,
+                    callback_data=None,
+                    progress_callback=progress_callback,
+                    chat_id=update.effective_chat.id
+                )
+            finally:
+                self.active_progress.pop(operation_id, None)
             
             # Clean up temp message and send real response
             await temp_message.delete()
             await self.send_response(update, response_data)
             
         except Exception as e:
-            logger.error(f"Error handling message: {e}")
-            await update.message.reply_text(f"❌ Error processing your request: {str(e)}")
+            logger.error("Error handling message: %s", e, exc_info=True)
+            await update.message.reply_text(error_text("Error processing your request", e))
 
     async def handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle inline keyboard button presses."""
@@ -328,8 +592,7 @@ class TelegramBot:
             query = update.callback_query
             await query.answer()
             
-            chat_id = query.message.chat_id
-            operation_id = f"{chat_id}_{int(time.time())}"
+            operation_id = next(self._op_counter)
             
             # Show processing message
             await query.edit_message_text("🔄 Processing your request...")
@@ -338,215 +601,220 @@ class TelegramBot:
             progress_callback = self.create_progress_callback(query.message, operation_id)
             
             # Call user handler
-            response_data = await self.call_user_handler(
-                message_text=None,
-                callback_data=query.data,
-                progress_callback=progress_callback
-            )
+            try:
+                response_data = await self.call_user_handler(
+                    message_text=None,
+                    callback_data=query.data,
+                    progress_callback=progress_callback,
+                    chat_id=query.message.chat_id
+                )
+            finally:
+                self.active_progress.pop(operation_id, None)
             
             # Handle response based on type
             await self.handle_callback_response(query, response_data, context)
             
         except Exception as e:
-            logger.error(f"Error handling callback: {e}")
-            await query.edit_message_text(f"❌ Error: {str(e)}")
+            logger.error("Error handling callback: %s", e, exc_info=True)
+            await query.edit_message_text(error_text("Error", e))
 
     async def call_user_handler(self, message_text: str = None, callback_data: str = None, 
-                              progress_callback: Callable = None) -> Dict[str, Any]:
-        """Call the user-provided handler function."""
+                              progress_callback: Callable = None, chat_id: Optional[int] = None) -> Response:
+        """Call the user-provided handler function.
+        
+        Calls for the same chat run one at a time, and at most
+        MAX_CONCURRENT_HANDLERS run across all chats.
+        """
+        chat_lock = self._chat_locks.get(chat_id)
+        if chat_lock is None:
+            chat_lock = self._chat_locks[chat_id] = asyncio.Lock()
+        
         try:
-            # Check if user handler is async
-            if asyncio.iscoroutinefunction(self.user_handler):
-                return await self.user_handler(message_text, callback_data, progress_callback)
-            else:
-                return self.user_handler(message_text, callback_data, progress_callback)
+            async with chat_lock, self._handler_sem:
+                response = await self._invoke_user_handler(message_text, callback_data, progress_callback)
+            
+            # Handlers written against the dict format still work
+            if isinstance(response, dict):
+                return self.response.from_dict(response)
+            return response
         except Exception as e:
-            logger.error(f"User handler error: {e}")
-            return self.response.error(f"Handler error: {str(e)}")
+            logger.error("User handler error: %s", e, exc_info=True)
+            return self.response.error(f"Handler error: {str(e)[:MAX_ERROR_CHARS]}")
 
-    async def handle_callback_response(self, query, response_data: Dict[str, Any], context):
+    async def handle_callback_response(self, query, response_data: Response, context):
         """Handle response from callback queries."""
-        response_type = response_data.get("type", "text")
-        
-        if response_type == "progress":
-            await self.handle_progress_response(query, response_data)
-        elif response_type == "file":
-            await self.handle_file_response(query, response_data, context)
-        else:
-            content = response_data.get("content", "No response")
-            parse_mode = response_data.get("parse_mode")
-            try:
-                await query.edit_message_text(content, parse_mode=parse_mode)
-            except Exception:
-                await query.edit_message_text(content)
-
-    async def handle_file_response(self, query, response_data: Dict[str, Any], context):
+        match response_data:
+            case ProgressResponse():
+                await self.handle_progress_response(query, response_data)
+            case FileResponse():
+                await self.handle_file_response(query, response_data, context)
+            case _:
+                content = response_data.content or "No response"
+                parse_mode = getattr(response_data, "parse_mode", None)
+                try:
+                    await query.edit_message_text(content, parse_mode=parse_mode)
+                except Exception:
+                    await query.edit_message_text(content)
+
+    async def handle_file_response(self, query, response_data: FileResponse, context):
         """Handle file responses from callbacks."""
         try:
-            file_path = response_data.get("file_path")
-            
-            if file_path and os.path.exists(file_path):
-                with open(file_path, 'rb') as f:
-                    await context.bot.send_document(
-                        chat_id=query.message.chat_id,
-                        document=f,
-                        filename=os.path.basename(file_path),
-                        caption=response_data.get("content", "")
-                    )
-                
-                # Cleanup if requested
-                if response_data.get("cleanup", False):
-                    try:
-                        os.remove(file_path)
-                        parent_dir = os.path.dirname(file_path)
-                        if os.path.exists(parent_dir) and not os.listdir(parent_dir):
-                            os.rmdir(parent_dir)
-                    except OSError:
-                        pass
-                
-                await query.edit_message_text("✅ File sent successfully!")
-            else:
+            file_path = response_data.file_path
+            
+            document, on_disk = await self.load_file_document(response_data)
+            if document is None:
                 await query.edit_message_text("❌ File not found or failed to create.")
+                return
+            
+            await context.bot.send_document(
+                chat_id=query.message.chat_id,
+                document=document,
+                filename=os.path.basename(file_path),
+                caption=response_data.content
+            )
+            
+            # Cleanup if requested
+            if response_data.cleanup and on_disk:
+                await asyncio.to_thread(remove_file, file_path, True)
+            
+            await query.edit_message_text("✅ File sent successfully!")
                 
         except Exception as e:
-            logger.error(f"File response error: {e}")
-            await query.edit_message_text(f"❌ Error sending file: {str(e)}")
+            logger.error("File response error: %s", e, exc_info=True)
+            await query.edit_message_text(error_text("Error sending file", e))
+
+    async def load_file_document(self, response_data: FileResponse) -> Tuple[Optional[bytes], bool]:
+        """Get the bytes to send for a file response, and whether they came from disk.
+        
+        An existing file wins over file_content. Generated content that will
+        be cleaned up anyway is sent straight from memory, without a round trip
+        through the filesystem; otherwise it is written out first, off the loop.
+        """
+        file_path = response_data.file_path
+        file_content = response_data.file_content
+        
+        try:
+            if not file_path:
+                raise FileNotFoundError(file_path)
+            return await read_file(file_path), True
+        except FileNotFoundError:
+            if not file_content:
+                return None, False
+        
+        if not response_data.cleanup:
+            try:
+                await write_text_file(file_path, file_content, mode='x')
+            except FileExistsError:
+                return await read_file(file_path), True
+        return file_content.encode('utf-8'), False
 
-    async def handle_progress_response(self, query, response_data: Dict[str, Any]):
+    async def handle_progress_response(self, query, response_data: ProgressResponse):
         """Handle progress bar responses."""
         try:
-            progress_config = response_data.get("progress_config", {})
-            total_steps = progress_config.get("total_steps", 100)
-            step_delay = progress_config.get("step_delay", 0.3)
-            title = progress_config.get("title", "Processing")
-            
-            progress_bar = ProgressBar(total=total_steps)
-            
-            for step in range(total_steps + 1):
-                progress_text = progress_bar.update(step)
-                emoji_progress = progress_bar.get_emoji_progress(step)
-                eta = progress_bar.get_eta(step) if step > 0 else "Calculating..."
-                
-                if step == total_steps:
-                    full_text = f"✅ **{title} Complete!**\n\n{response_data.get('content', 'Operation finished!')}"
-                else:
-                    full_text = f"🔄 **{title}**\n\n{progress_text}\n{emoji_progress}\nETA: {eta}"
-                
-                await query.edit_message_text(full_text, parse_mode='Markdown')
-                
-                if step < total_steps:
-                    await asyncio.sleep(step_delay)
-                    
+            await self.run_progress(query.edit_message_text, query.message.chat_id, response_data)
         except Exception as e:
-            logger.error(f"Progress response error: {e}")
-            await query.edit_message_text(f"❌ Progress error: {str(e)}")
+            logger.error("Progress response error: %s", e, exc_info=True)
+            await query.edit_message_text(error_text("Progress error", e))
 
-    async def send_response(self, update: Update, response_data: Dict[str, Any]):
+    async def run_progress(self, edit: Callable, chat_id: int, response_data: ProgressResponse):
+        """Step a progress response's bar to completion by editing one message.
+        
+        Frames are drawn at the PROGRESS_FRAMES percentages, sleeping through
+        the steps in between, and only rendered when the chat's rate budget
+        can send them. The parts that never change are built once up front.
+        """
+        total_steps = response_data.total_steps
+        step_delay = response_data.step_delay
+        title = response_data.title
+        
+        header = f"🔄 **{title}**\n\n"
+        complete_text = f"✅ **{title} Complete!**\n\n{response_data.content}"
+        
+        progress_bar = ProgressBar(total=total_steps)
+        last_text = None
+        
+        frames = sorted({total_steps * pct // 100 for pct in self.PROGRESS_FRAMES}) if total_steps > 0 else []
+        
+        for step, next_step in zip(frames, frames[1:] + [total_steps]):
+            # Skip frames the chat's rate budget can't fit, and unchanged ones
+            if self.rate_limiter.ready(chat_id):
+                now_ns = time.monotonic_ns()
+                full_text = (header + progress_bar.update(step) + "\n" + progress_bar.get_emoji_progress(step)
+                             + "\nETA: " + progress_bar.get_eta(step, now_ns))
+                if full_text != last_text and await self.edit_throttled(
+                        edit, chat_id, full_text, parse_mode='Markdown'):
+                    last_text = full_text
+            
+            await asyncio.sleep(step_delay * (next_step - step))
+        
+        await self.edit_throttled(edit, chat_id, complete_text, parse_mode='Markdown', force=True)
+
+    async def send_response(self, update: Update, response_data: Response):
         """Send response based on type."""
         try:
-            response_type = response_data.get("type", "text")
-            
-            if response_type == "text":
-                await update.message.reply_text(response_data["content"])
-                
-            elif response_type == "styled_text":
-                parse_mode = response_data.get("parse_mode", "Markdown")
-                await update.message.reply_text(response_data["content"], parse_mode=parse_mode)
-                
-            elif response_type == "inline_keyboard":
-                keyboard_data = response_data.get("keyboard", [])
-                keyboard = []
-                
-                for row in keyboard_data:
-                    button_row = []
-                    for button in row:
-                        button_row.append(InlineKeyboardButton(
-                            text=button["text"],
-                            callback_data=button["callback_data"]
-                        ))
-                    keyboard.append(button_row)
-                
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                parse_mode = response_data.get("parse_mode", "Markdown")
-                await update.message.reply_text(
-                    response_data["content"],
-                    parse_mode=parse_mode,
-                    reply_markup=reply_markup
-                )
-                
-            elif response_type == "progress":
-                message = await update.message.reply_text("🔄 Starting operation...")
-                await self.handle_progress_response_for_message(message, response_data)
-                
-            elif response_type == "file":
-                await self.handle_file_response_for_message(update, response_data)
+            match response_data:
+                case TextResponse(content):
+                    await update.message.reply_text(content)
+                    
+                case StyledTextResponse(content, parse_mode):
+                    await update.message.reply_text(content, parse_mode=parse_mode)
+                    
+                case KeyboardResponse(content, buttons, parse_mode):
+                    keyboard = [
+                        [InlineKeyboardButton(text=text, callback_data=callback_data) for text, callback_data in row]
+                        for row in buttons
+                    ]
+                    reply_markup = InlineKeyboardMarkup(keyboard)
+                    await update.message.reply_text(
+                        content,
+                        parse_mode=parse_mode,
+                        reply_markup=reply_markup
+                    )
+                    
+                case ProgressResponse():
+                    message = await update.message.reply_text("🔄 Starting operation...")
+                    await self.handle_progress_response_for_message(message, response_data)
+                    
+                case FileResponse():
+                    await self.handle_file_response_for_message(update, response_data)
                 
         except Exception as e:
-            logger.error(f"Send response error: {e}")
-            await update.message.reply_text(f"❌ Response error: {str(e)}")
+            logger.error("Send response error: %s", e, exc_info=True)
+            await update.message.reply_text(error_text("Response error", e))
 
-    async def handle_progress_response_for_message(self, message, response_data: Dict[str, Any]):
+    async def handle_progress_response_for_message(self, message, response_data: ProgressResponse):
         """Handle progress responses for direct messages."""
         try:
-            progress_config = response_data.get("progress_config", {})
-            total_steps = progress_config.get("total_steps", 100)
-            step_delay = progress_config.get("step_delay", 0.3)
-            title = progress_config.get("title", "Processing")
-            
-            progress_bar = ProgressBar(total=total_steps)
-            
-            for step in range(total_steps + 1):
-                progress_text = progress_bar.update(step)
-                emoji_progress = progress_bar.get_emoji_progress(step)
-                eta = progress_bar.get_eta(step) if step > 0 else "Calculating..."
-                
-                if step == total_steps:
-                    full_text = f"✅ **{title} Complete!**\n\n{response_data.get('content', 'Operation finished!')}"
-                else:
-                    full_text = f"🔄 **{title}**\n\n{progress_text}\n{emoji_progress}\nETA: {eta}"
-                
-                await message.edit_text(full_text, parse_mode='Markdown')
-                
-                if step < total_steps:
-                    await asyncio.sleep(step_delay)
-                    
+            await self.run_progress(message.edit_text, message.chat_id, response_data)
         except Exception as e:
-            logger.error(f"Progress message error: {e}")
-            await message.edit_text(f"❌ Progress error: {str(e)}")
+            logger.error("Progress message error: %s", e, exc_info=True)
+            await message.edit_text(error_text("Progress error", e))
 
-    async def handle_file_response_for_message(self, update: Update, response_data: Dict[str, Any]):
+    async def handle_file_response_for_message(self, update: Update, response_data: FileResponse):
         """Handle file responses for direct messages."""
         try:
-            file_path = response_data.get("file_path", "temp.txt")
-            file_content = response_data.get("file_content")
-            content = response_data.get("content", "")
-            
-            # Create file if content provided
-            if file_content and not os.path.exists(file_path):
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(file_content)
+            file_path = response_data.file_path
+            content = response_data.content
             
             # Send content message first if provided
             if content:
                 await update.message.reply_text(content)
             
             # Send file
-            if os.path.exists(file_path):
-                with open(file_path, 'rb') as f:
-                    await update.message.reply_document(f, filename=os.path.basename(file_path))
-                
-                # Cleanup if requested
-                if response_data.get("cleanup", True):
-                    try:
-                        os.remove(file_path)
-                    except OSError:
-                        pass
-            else:
+            document, on_disk = await self.load_file_document(response_data)
+            if document is None:
                 await update.message.reply_text("❌ File not found or failed to create.")
+                return
+            
+            await update.message.reply_document(document, filename=os.path.basename(file_path))
+            
+            # Cleanup if requested
+            if response_data.cleanup and on_disk:
+                await asyncio.to_thread(remove_file, file_path)
                 
         except Exception as e:
-            logger.error(f"File message error: {e}")
-            await update.message.reply_text(f"❌ File error: {str(e)}")
+            logger.error("File message error: %s", e, exc_info=True)
+            await update.message.reply_text(error_text("File error", e))
 
     async def setup_commands(self):
         """Set up bot commands menu."""
@@ -562,7 +830,23 @@ class TelegramBot:
         """Start the bot."""
         try:
             self.start_time = time.time()
-            self.application = Application.builder().token(self.bot_token).build()
+            self.application = (
+                Application.builder()
+                .token(self.bot_token)
+                .concurrent_updates(self.MAX_CONCURRENT_UPDATES)
+                .request(HTTPXRequest(
+                    connection_pool_size=self.CONNECTION_POOL_SIZE,
+                    http_version=HTTP_VERSION,
+                    pool_timeout=5.0,
+                    read_timeout=30.0,
+                    write_timeout=30.0
+                ))
+                .get_updates_request(HTTPXRequest(
+                    connection_pool_size=self.POLLING_POOL_SIZE,
+                    http_version=HTTP_VERSION
+                ))
+                .build()
+            )
             
             # Add handlers
             self.application.add_handler(CommandHandler("start", self.start_command))
@@ -581,22 +865,36 @@ class TelegramBot:
             # Start polling
             await self.application.updater.start_polling()
             
-            logger.info(f"🤖 {self.bot_name} is running...")
+            logger.info("🤖 %s is running...", self.bot_name)
             logger.info("📊 Progress tracking: ✅ Active")
             logger.info("🎛️ Interactive keyboards: ✅ Active")
             logger.info("📁 File operations: ✅ Active")
             logger.info("🎨 Rich formatting: ✅ Active")
             
-            # Keep running
-            await asyncio.Event().wait()
+            # Keep running until SIGINT/SIGTERM
+            loop = asyncio.get_running_loop()
+            stop_future = loop.create_future()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, lambda: stop_future.done() or stop_future.set_result(None))
+                except NotImplementedError:
+                    # Windows event loops have no signal handlers; Ctrl+C still raises KeyboardInterrupt
+                    pass
+            await stop_future
+            logger.info("\n👋 %s stopped!", self.bot_name)
             
         except KeyboardInterrupt:
-            logger.info(f"\n👋 {self.bot_name} stopped!")
+            logger.info("\n👋 %s stopped!", self.bot_name)
         except Exception as e:
-            logger.error(f"Bot error: {e}")
+            logger.error("Bot error: %s", e, exc_info=True)
         finally:
             if self.application:
-                await self.application.stop()
+                # Stop polling first, then let in-flight handlers finish before closing the HTTP pools
+                if self.application.updater and self.application.updater.running:
+                    await self.application.updater.stop()
+                if self.application.running:
+                    await self.application.stop()
+                await self.application.shutdown()
 
 def create_bot(bot_token: str = None, user_handler: Callable = None, 
                bot_name: str = "Enhanced Bot", bot_description: str = "Powered by Progress Tracking"):
@@ -621,12 +919,16 @@ def create_bot(bot_token: str = None, user_handler: Callable = None,
             bot_token = input("Enter your Bot Token: ").strip()
             if not bot_token:
                 raise ValueError("Bot token is required!")
+            if not BOT_TOKEN_PATTERN.match(bot_token):
+                raise ValueError("Bot token doesn't look like '123456:ABC...' - check the value from @BotFather")
             
             # Save to .env
-            with open('.env', 'a') as f:
-                f.write(f"\nBOT_TOKEN={bot_token}\n")
+            save_env_var('BOT_TOKEN', bot_token)
             print("✅ Token saved to .env file!")
     
+    # Faster event loop for the many small Telegram API calls
+    install_uvloop()
+    
     # Default handler if none provided
     if not user_handler:
         def default_handler(message_text=None, callback_data=None, progress_callback=None):
@@ -1,40 +1,116 @@
 import whisper
+import os
 import sys
 import torch
 import argparse
 
+# faster-whisper (CTranslate2, int8) is preferred; reference Whisper is the fallback
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".flac", ".ogg", ".opus", ".webm", ".mp4", ".mkv", ".aac"}
+
+def load_model(backend, name, device, compile_encoder=True):
+    """Load a Whisper model on the given backend."""
+    if backend == "faster":
+        compute_type = "int8_float16" if device == "cuda" else "int8"
+        print(f"Compute type: {compute_type}")
+        return WhisperModel(name, device=device, compute_type=compute_type)
+
+    model = whisper.load_model(name, device=device)
+    if device == "cuda":
+        # TF32 tensor cores for any matmuls left in FP32 (Ampere and newer)
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        # The encoder always sees 30s windows, so its compiled graph is reused for every chunk
+        if compile_encoder:
+            model.encoder = torch.compile(model.encoder, mode="reduce-overhead")
+    return model
+
+def transcribe(model, backend, audio, language, task):
+    """Transcribe audio, yielding (start, end, text) for each segment."""
+    if backend == "faster":
+        segments, info = model.transcribe(
+            audio,
+            language=language,
+            task=task,
+            beam_size=5,
+            vad_filter=True
+        )
+        print(f"Detected language: {info.language} ({info.language_probability:.2f})")
+        for segment in segments:
+            yield segment.start, segment.end, segment.text
+        return
+
+    with torch.inference_mode(), torch.autocast("cuda", dtype=torch.float16, enabled=model.device.type == "cuda"):
+        result = model.transcribe(
+            audio,
+            language=language,
+            task=task,
+            verbose=True
+        )
+    for segment in result["segments"]:
+        yield segment["start"], segment["end"], segment["text"]
+
+def iter_audio_paths(audio, audio_dir):
+    """Yield the audio files to transcribe; "-" reads paths from stdin, one per line."""
+    for path in audio:
+        if path == "-":
+            for line in sys.stdin:
+                if line.strip():
+                    yield line.strip()
+        else:
+            yield path
+
+    if audio_dir:
+        with os.scandir(audio_dir) as entries:
+            names = sorted(entry.name for entry in entries
+                           if entry.is_file() and os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS)
+        for name in names:
+            yield os.path.join(audio_dir, name)
+
 def main():
     parser = argparse.ArgumentParser(description="Transcribe audio using Whisper with timestamps.")
-    parser.add_argument("--audio", type=str, default="audio.webm", help="Path to the audio file")
+    parser.add_argument("--audio", type=str, nargs="+", default=None,
+                        help="Audio file(s) to transcribe, or - to read paths from stdin (default: audio.webm)")
+    parser.add_argument("--audio-dir", type=str, default=None, help="Transcribe every audio file in this directory")
     parser.add_argument("--model", type=str, default="turbo", help="Whisper model to use (e.g., tiny, base, small, medium, large, turbo)")
     parser.add_argument("--language", type=str, default=None, help="Language code (e.g., en, fr, de, etc.)")
     parser.add_argument("--task", type=str, default="transcribe", choices=["transcribe", "translate"], help="Task: transcribe or translate")
+    parser.add_argument("--backend", type=str, default="faster" if WhisperModel else "openai", choices=["faster", "openai"],
+                        help="faster: faster-whisper with int8 quantization; openai: reference Whisper")
+    parser.add_argument("--compile", action=argparse.BooleanOptionalAction, default=True,
+                        help="torch.compile the encoder for the openai backend on CUDA")
     args = parser.parse_args()
+    if args.audio is None:
+        args.audio = [] if args.audio_dir else ["audio.webm"]
+
+    if args.backend == "faster" and WhisperModel is None:
+        print("faster-whisper is not installed; use --backend openai or install faster-whisper")
+        sys.exit(1)
 
     # Check for CUDA
     device = "cuda" if torch.cuda.is_available() else "cpu"
     print(f"Using device: {device}")
 
-    # Load the specified model
-    model = whisper.load_model(args.model, device=device)
-    print(f"Model {args.model} loaded.")
-
-    # Transcribe the audio file
-    print(f"Transcribing: {args.audio}")
-    result = model.transcribe(
-        args.audio,
-        language=args.language,
-        task=args.task,
-        verbose=True
-    )
-
-    # Print transcription with timestamps
-    print("\nTranscription with timestamps:")
-    for segment in result["segments"]:
-        start = segment["start"]
-        end = segment["end"]
-        text = segment["text"]
-        print(f"[{start:.2f}s -> {end:.2f}s] {text}")
+    # Load the specified model once for every file
+    model = load_model(args.backend, args.model, device, args.compile)
+    print(f"Model {args.model} loaded ({args.backend}).")
+
+    for audio in iter_audio_paths(args.audio, args.audio_dir):
+        # Transcribe the audio file
+        print(f"\nTranscribing: {audio}")
+        try:
+            segments = transcribe(model, args.backend, audio, args.language, args.task)
+
+            # Print transcription with timestamps
+            print("\nTranscription with timestamps:")
+            for start, end, text in segments:
+                print(f"[{start:.2f}s -> {end:.2f}s] {text}", flush=True)
+        except Exception as e:
+            print(f"Failed to transcribe {audio}: {e}")
 
 if __name__ == "__main__":
     main()
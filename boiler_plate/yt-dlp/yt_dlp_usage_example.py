@@ -39,7 +39,7 @@ def main():
     
     try:
         info = downloader.get_video_info(url)
-        qualities = downloader.get_available_qualities(url)
+        qualities = downloader.get_available_qualities(url, info=info)
         
         print(f"   🎥 Title: {info.get('title', 'N/A')}")
         print(f"   👤 Uploader: {info.get('uploader', 'N/A')}")
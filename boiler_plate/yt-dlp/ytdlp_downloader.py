@@ -10,7 +10,11 @@ import sys
 import re
 import json
 import time
-from typing import Dict, List, Optional, Any
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
 try:
@@ -21,6 +25,89 @@ except ImportError:
     print("pip install yt-dlp tqdm")
     sys.exit(1)
 
+# diskcache is optional; without it metadata is only cached for this process
+try:
+    from diskcache import Cache
+except ImportError:
+    Cache = None
+
+# How long extracted video metadata stays cached (seconds)
+META_CACHE_TTL = 86400
+
+# Concurrent metadata lookups, and concurrent downloads when no quality prompt is needed
+METADATA_WORKERS = 8
+DOWNLOAD_WORKERS = 4
+
+# youtu.be/ and youtube.com/watch?v= URL patterns
+_YOUTU_BE_RE = re.compile(r'(?:https?://)?(?:www\.)?youtu\.be/([a-zA-Z0-9_-]+)')
+_YOUTUBE_RE = re.compile(r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]+)')
+_UNSAFE_FILENAME_RE = re.compile(r'[<>:"/\\|?*]')
+
+
+@lru_cache(maxsize=4096)
+def _normalize_url(url: str) -> str:
+    # Remove any whitespace
+    url = url.strip()
+    
+    # youtu.be/ format
+    match = _YOUTU_BE_RE.search(url)
+    if match:
+        video_id = match.group(1)
+        return f"https://www.youtube.com/watch?v={video_id}"
+    
+    # youtube.com/watch format
+    match = _YOUTUBE_RE.search(url)
+    if match:
+        return url if url.startswith('http') else f"https://{url}"
+    
+    # If no match, assume it's already in correct format or invalid
+    return url
+
+
+class DownloadProgress:
+    """
+    tqdm progress for one download, so concurrent downloads don't share a bar
+    """
+    
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.progress_bar = None
+    
+    def progress_hook(self, d: Dict[str, Any]) -> None:
+        """
+        Custom progress hook for yt-dlp downloads
+        
+        Args:
+            d: Download progress dictionary
+        """
+        if d['status'] == 'downloading':
+            if not self.progress_bar:
+                total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')
+                if total_bytes:
+                    self.progress_bar = tqdm(
+                        total=total_bytes,
+                        unit='B',
+                        unit_scale=True,
+                        desc=f"📥 {self.filename}"
+                    )
+            
+            if self.progress_bar:
+                downloaded = d.get('downloaded_bytes', 0)
+                self.progress_bar.n = downloaded
+                self.progress_bar.refresh()
+                
+        elif d['status'] == 'finished':
+            if self.progress_bar:
+                self.progress_bar.close()
+                self.progress_bar = None
+            print(f"\n✅ Downloaded: {d['filename']}")
+            
+        elif d['status'] == 'error':
+            if self.progress_bar:
+                self.progress_bar.close()
+                self.progress_bar = None
+            print(f"\n❌ Error downloading: {d.get('filename', 'Unknown')}")
+
 
 class YouTubeDownloader:
     def __init__(self, download_dir: str = "downloads"):
@@ -32,8 +119,16 @@ class YouTubeDownloader:
         """
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(exist_ok=True)
-        self.progress_bar = None
-        self.current_filename = ""
+        self._meta_executor = None
+        
+        # Metadata cache keyed by normalized URL
+        if Cache is not None:
+            self._meta_cache = Cache(str(self.download_dir / '.meta_cache'))
+        else:
+            self._meta_cache = {}
+        
+        # One long-lived info extractor per thread so connections are kept alive
+        self._local = threading.local()
         
     def normalize_url(self, url: str) -> str:
         """
@@ -46,60 +141,90 @@ class YouTubeDownloader:
         Returns:
             Normalized YouTube URL
         """
-        # Remove any whitespace
-        url = url.strip()
-        
-        # Pattern for youtu.be/ format
-        youtu_be_pattern = r'(?:https?://)?(?:www\.)?youtu\.be/([a-zA-Z0-9_-]+)'
-        match = re.search(youtu_be_pattern, url)
-        if match:
-            video_id = match.group(1)
-            return f"https://www.youtube.com/watch?v={video_id}"
-        
-        # Pattern for youtube.com/watch format
-        youtube_pattern = r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]+)'
-        match = re.search(youtube_pattern, url)
-        if match:
-            return url if url.startswith('http') else f"https://{url}"
-        
-        # If no match, assume it's already in correct format or invalid
-        return url
+        return _normalize_url(url)
+    
+    def _cache_get(self, key: str) -> Optional[Any]:
+        return self._meta_cache.get(key)
+    
+    def _cache_set(self, key: str, value: Any) -> None:
+        if Cache is not None:
+            self._meta_cache.set(key, value, expire=META_CACHE_TTL)
+        else:
+            self._meta_cache[key] = value
+    
+    def _info_ydl(self) -> "yt_dlp.YoutubeDL":
+        """
+        Return this thread's YoutubeDL used for metadata extraction
+        """
+        ydl = getattr(self._local, 'ydl', None)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL({
+                'quiet': True,
+                'no_warnings': True,
+            })
+            atexit.register(ydl.close)
+            self._local.ydl = ydl
+        return ydl
     
-    def get_video_info(self, url: str) -> Dict[str, Any]:
+    def get_video_info(self, url: str, refresh: bool = False) -> Dict[str, Any]:
         """
         Get video information including available qualities
         
         Args:
             url: YouTube video URL
+            refresh: Skip the metadata cache and re-extract
             
         Returns:
             Dictionary containing video information
         """
-        normalized_url = self.normalize_url(url)
-        
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-        }
+        return self._get_video_info_normalized(self.normalize_url(url), refresh)
+    
+    def _get_video_info_normalized(self, normalized_url: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        get_video_info for a URL that has already been normalized
+        """
+        if not refresh:
+            info = self._cache_get(f"info:{normalized_url}")
+            if info is not None:
+                return info
         
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(normalized_url, download=False)
-                return info
+            ydl = self._info_ydl()
+            info = ydl.sanitize_info(ydl.extract_info(normalized_url, download=False))
         except Exception as e:
             raise Exception(f"Failed to get video info: {str(e)}")
+        
+        self._cache_set(f"info:{normalized_url}", info)
+        return info
     
-    def get_available_qualities(self, url: str) -> List[Dict[str, Any]]:
+    def get_available_qualities(self, url: str, info: Optional[Dict[str, Any]] = None,
+                                refresh: bool = False) -> List[Dict[str, Any]]:
         """
         Get all available video qualities
         
         Args:
             url: YouTube video URL
+            info: Video information already fetched for this URL, if any
+            refresh: Skip the metadata cache and re-extract
             
         Returns:
             List of available quality options
         """
-        info = self.get_video_info(url)
+        return self._get_available_qualities_normalized(self.normalize_url(url), info, refresh)
+    
+    def _get_available_qualities_normalized(self, normalized_url: str, info: Optional[Dict[str, Any]] = None,
+                                            refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        get_available_qualities for a URL that has already been normalized
+        """
+        key = f"qualities:{normalized_url}"
+        if not refresh and info is None:
+            qualities = self._cache_get(key)
+            if qualities is not None:
+                return qualities
+        
+        if info is None:
+            info = self._get_video_info_normalized(normalized_url, refresh)
         formats = info.get('formats', [])
         
         # Filter for video formats with both video and audio or video-only
@@ -133,6 +258,7 @@ class YouTubeDownloader:
             reverse=True
         )
         
+        self._cache_set(key, sorted_qualities)
         return sorted_qualities
     
     def display_qualities(self, qualities: List[Dict[str, Any]], video_title: str) -> None:
@@ -163,41 +289,6 @@ class YouTubeDownloader:
         print(f"{len(qualities) + 1:2d}. Audio Only (Best Quality)")
         print("-" * 30)
     
-    def progress_hook(self, d: Dict[str, Any]) -> None:
-        """
-        Custom progress hook for yt-dlp downloads
-        
-        Args:
-            d: Download progress dictionary
-        """
-        if d['status'] == 'downloading':
-            if not self.progress_bar:
-                total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')
-                if total_bytes:
-                    self.progress_bar = tqdm(
-                        total=total_bytes,
-                        unit='B',
-                        unit_scale=True,
-                        desc=f"📥 {self.current_filename}"
-                    )
-            
-            if self.progress_bar:
-                downloaded = d.get('downloaded_bytes', 0)
-                self.progress_bar.n = downloaded
-                self.progress_bar.refresh()
-                
-        elif d['status'] == 'finished':
-            if self.progress_bar:
-                self.progress_bar.close()
-                self.progress_bar = None
-            print(f"\n✅ Downloaded: {d['filename']}")
-            
-        elif d['status'] == 'error':
-            if self.progress_bar:
-                self.progress_bar.close()
-                self.progress_bar = None
-            print(f"\n❌ Error downloading: {d.get('filename', 'Unknown')}")
-    
     def download_video(self, url: str, quality_choice: int = None) -> bool:
         """
         Download video with selected quality
@@ -211,14 +302,25 @@ class YouTubeDownloader:
         """
         try:
             normalized_url = self.normalize_url(url)
-            info = self.get_video_info(normalized_url)
+            info = self._get_video_info_normalized(normalized_url)
+            qualities = self._get_available_qualities_normalized(normalized_url, info)
+        except Exception as e:
+            print(f"❌ Download failed: {str(e)}")
+            return False
+        
+        return self._download_with_info(normalized_url, info, qualities, quality_choice)
+    
+    def _download_with_info(self, normalized_url: str, info: Dict[str, Any],
+                            qualities: List[Dict[str, Any]], quality_choice: int = None) -> bool:
+        """
+        Download a video whose metadata and qualities are already fetched
+        """
+        try:
             video_title = info.get('title', 'Unknown Video')
             
             # Sanitize filename
-            safe_title = re.sub(r'[<>:"/\\|?*]', '_', video_title)
-            self.current_filename = safe_title[:50] + "..." if len(safe_title) > 50 else safe_title
-            
-            qualities = self.get_available_qualities(normalized_url)
+            safe_title = _UNSAFE_FILENAME_RE.sub('_', video_title)
+            progress = DownloadProgress(safe_title[:50] + "..." if len(safe_title) > 50 else safe_title)
             
             if quality_choice is None:
                 self.display_qualities(qualities, video_title)
@@ -237,7 +339,7 @@ class YouTubeDownloader:
             # Configure download options
             ydl_opts = {
                 'outtmpl': str(self.download_dir / '%(title)s.%(ext)s'),
-                'progress_hooks': [self.progress_hook],
+                'progress_hooks': [progress.progress_hook],
             }
             
             if quality_choice <= len(qualities):
@@ -268,31 +370,62 @@ class YouTubeDownloader:
             print(f"❌ Download failed: {str(e)}")
             return False
     
-    def batch_download(self, urls: List[str], quality_choice: int = None) -> Dict[str, bool]:
+    def _prefetch(self, url: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+        """
+        Fetch metadata and qualities for a URL, returning None for both on failure
+        """
+        normalized_url = self.normalize_url(url)
+        try:
+            info = self._get_video_info_normalized(normalized_url)
+            return normalized_url, info, self._get_available_qualities_normalized(normalized_url, info)
+        except Exception as e:
+            print(f"❌ Failed to get video info for {url}: {str(e)}")
+            return normalized_url, None, None
+    
+    def batch_download(self, urls: List[str], quality_choice: int = None, delay: float = 0) -> Dict[str, bool]:
         """
         Download multiple videos
         
+        Metadata for all URLs is fetched concurrently up front. With a fixed
+        quality_choice the downloads run concurrently too; interactive
+        selection downloads one video at a time.
+        
         Args:
             urls: List of YouTube URLs
             quality_choice: Quality choice for all videos (None for interactive)
+            delay: Seconds to wait between sequential downloads
             
         Returns:
             Dictionary mapping URLs to success status
         """
-        results = {}
-        
         print(f"📚 Batch downloading {len(urls)} video(s)...")
         
-        for i, url in enumerate(urls, 1):
+        # Kept across batches so each worker's YoutubeDL stays warm
+        if self._meta_executor is None:
+            self._meta_executor = ThreadPoolExecutor(max_workers=METADATA_WORKERS)
+        metas = list(self._meta_executor.map(self._prefetch, urls))
+        
+        def download(meta: Tuple) -> bool:
+            normalized_url, info, qualities = meta
+            if info is None:
+                return False
+            return self._download_with_info(normalized_url, info, qualities, quality_choice)
+        
+        if quality_choice is not None:
+            with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+                return dict(zip(urls, executor.map(download, metas)))
+        
+        results = {}
+        for i, (url, meta) in enumerate(zip(urls, metas), 1):
             print(f"\n{'='*60}")
             print(f"📹 Processing video {i}/{len(urls)}")
             print(f"🔗 URL: {url}")
             
-            results[url] = self.download_video(url, quality_choice)
+            results[url] = download(meta)
             
-            if i < len(urls):
-                print("\n⏸️  Waiting 2 seconds before next download...")
-                time.sleep(2)
+            if delay and i < len(urls):
+                print(f"\n⏸️  Waiting {delay} seconds before next download...")
+                time.sleep(delay)
         
         return results
 
@@ -321,7 +454,7 @@ def test_downloader():
             print(f"📹 Title: {info.get('title', 'N/A')}")
             print(f"⏱️  Duration: {info.get('duration', 'N/A')} seconds")
             
-            qualities = downloader.get_available_qualities(url)
+            qualities = downloader.get_available_qualities(url, info=info)
             print(f"🎯 Available qualities: {len(qualities)}")
             
             print("✅ Test passed!")
@@ -13,37 +13,109 @@ Usage as script:
     python goose.py
 """
 
+import codecs
 import subprocess
 import time
 import os
+import re
 import signal
 import sys
-import threading
+from fnmatch import fnmatch
 from pathlib import Path
 import select
 
+# Goose's input prompt, e.g. "( O)>", shown when it is ready for the next message
+_PROMPT_RE = re.compile(r'^\s*\(\s*O\)>', re.MULTILINE)
+
+# Extensions of files Goose is expected to generate, when no patterns are given
+_ALLOWED_SUFFIXES = {'.py', '.js', '.html', '.css', '.txt', '.md'}
+
 class GooseAutomator:
     def __init__(self, goose_path="/Users/bhavya/.local/bin/goose"):
         self.goose_path = goose_path
         self.process = None
         self.generated_file = None
         self.output_buffer = []
-        self.monitoring = False
+        self.last_output = time.monotonic()
+        self.prompt_seen = False
+        self.output_closed = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial_line = ""
         
-    def monitor_output(self):
-        """Monitor Goose output in a separate thread"""
-        while self.monitoring and self.process:
-            try:
-                if self.process.stdout:
-                    line = self.process.stdout.readline()
-                    if line:
-                        print(f"🐦 Goose: {line.strip()}")
-                        self.output_buffer.append(line.strip())
-                    else:
-                        time.sleep(0.1)
-            except Exception as e:
-                print(f"⚠️ Output monitoring error: {e}")
-                break
+    def _drain(self, timeout):
+        """Wait up to timeout seconds for Goose output and echo whatever is available
+        
+        Returns True if any output was read.
+        """
+        fd = self.process.stdout.fileno()
+        ready, _, _ = select.select([fd], [], [], timeout)
+        if not ready:
+            return False
+        
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            return False
+        if not data:
+            self.output_closed = True
+            self._echo_lines([self._partial_line + self._decoder.decode(b"", final=True)])
+            self._partial_line = ""
+            return False
+        
+        text = self._decoder.decode(data)
+        self.output_buffer.append(text)
+        self.last_output = time.monotonic()
+        
+        # Reads can end mid-line; keep the unfinished line for the next read so
+        # lines print whole and a prompt split across reads is still matched.
+        # expect_response clears it, so it only holds output since the reset
+        text = self._partial_line + text
+        if _PROMPT_RE.search(text):
+            self.prompt_seen = True
+        lines = text.split("\n")
+        self._partial_line = lines.pop()
+        self._echo_lines(lines)
+        return True
+    
+    def _echo_lines(self, lines):
+        for line in lines:
+            if line.strip():
+                print(f"🐦 Goose: {line.strip()}")
+    
+    def drain_pending(self):
+        """Read all output Goose has already written, without waiting
+        
+        Called before the script blocks on anything other than Goose so the
+        pipe never fills up and stalls it.
+        """
+        while self._drain(0):
+            pass
+                
+    def wait_for_response(self, max_wait=120, idle_threshold=20):
+        """Wait until Goose shows its prompt, goes quiet for idle_threshold seconds, or max_wait passes"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            now = time.monotonic()
+            if self.prompt_seen or now - self.last_output > idle_threshold:
+                return True
+            if now >= deadline or self.output_closed or self.process.poll() is not None:
+                return False
+            
+            # Sleep in select until output arrives or the idle/deadline limit could be hit
+            self._drain(min(deadline - now, idle_threshold - (now - self.last_output)))
+    
+    def expect_response(self):
+        """Reset readiness tracking before sending Goose new input
+        
+        The previous prompt has no trailing newline, so it is still the
+        unfinished line; flush it so only output after the reset can match.
+        """
+        if self.process and not self.output_closed:
+            self.drain_pending()
+        self._echo_lines([self._partial_line])
+        self._partial_line = ""
+        self.prompt_seen = False
+        self.last_output = time.monotonic()
                 
     def start_goose_session(self):
         """Start an interactive Goose session"""
@@ -59,14 +131,13 @@ class GooseAutomator:
                 universal_newlines=True
             )
             
-            # Start output monitoring in a separate thread
-            self.monitoring = True
-            monitor_thread = threading.Thread(target=self.monitor_output, daemon=True)
-            monitor_thread.start()
+            # Output is read without blocking, whenever the script waits on Goose
+            os.set_blocking(self.process.stdout.fileno(), False)
             
             # Wait for goose to initialize and show its prompt
             print("⏳ Waiting for Goose to initialize...")
-            time.sleep(5)
+            self.expect_response()
+            self.wait_for_response(max_wait=15, idle_threshold=3)
             print("✅ Goose session started successfully")
             return True
             
@@ -85,6 +156,7 @@ class GooseAutomator:
             print("=" * 60)
             
             # Send the prompt
+            self.expect_response()
             self.process.stdin.write(prompt + "\n")
             self.process.stdin.flush()
             
@@ -92,8 +164,9 @@ class GooseAutomator:
             print("⏳ Waiting for Goose to generate code...")
             print("(This may take 30-60 seconds depending on the complexity)")
             
-            # Wait longer for code generation
-            time.sleep(30)
+            # Returns as soon as Goose is back at its prompt or has gone quiet
+            if not self.wait_for_response():
+                print("⏱️ Goose is still busy; checking for files anyway")
             
             # Check if files were created during this time
             print("🔍 Checking for newly created files...")
@@ -103,46 +176,41 @@ class GooseAutomator:
             print(f"❌ Failed to send prompt: {e}")
             return False
     
-    def find_generated_file(self, file_patterns=None):
+    def find_generated_file(self, file_patterns=None, debug=False):
         """Find the generated file based on patterns or recent modification"""
         print("🔍 Searching for generated file...")
+        self.drain_pending()
         
-        current_dir = Path(".")
-        
-        # Use provided patterns or default ones
-        if file_patterns is None:
-            file_patterns = [
-                "*.py",  # Any Python file
-                "*.js",  # JavaScript files
-                "*.html", # HTML files
-                "*.css", # CSS files
-                "*.txt", # Text files
-                "*.md"   # Markdown files
-            ]
-        
-        # Find all files matching the patterns (excluding this script)
-        found_files = []
-        for pattern in file_patterns:
-            for file_path in current_dir.glob(pattern):
-                if file_path.name != "goose.py":
-                    found_files.append(file_path)
+        # One directory pass: keep the most recently modified matching file
+        best_path = None
+        best_mtime = -1
+        names = []
+        with os.scandir(".") as entries:
+            for entry in entries:
+                names.append(entry.name)
+                if entry.name == "goose.py" or not entry.is_file():
+                    continue
+                
+                # Use provided patterns or the default extensions
+                if file_patterns is None:
+                    if os.path.splitext(entry.name)[1].lower() not in _ALLOWED_SUFFIXES:
+                        continue
+                elif not any(fnmatch(entry.name, pattern) for pattern in file_patterns):
+                    continue
+                
+                mtime = entry.stat().st_mtime
+                if mtime > best_mtime:
+                    best_path, best_mtime = entry.path, mtime
         
-        if found_files:
-            # Sort by modification time, get the most recent
-            recent_file = max(found_files, key=lambda f: f.stat().st_mtime)
-            
-            # Check if it was modified recently (within last 2 minutes)
-            recent_time = recent_file.stat().st_mtime
-            current_time = time.time()
-            
-            if current_time - recent_time < 120:  # 2 minutes
-                self.generated_file = recent_file
-                print(f"📁 Found recently modified file: {self.generated_file}")
-                return True
+        # Check if it was modified recently (within last 2 minutes)
+        if best_path is not None and time.time() - best_mtime < 120:
+            self.generated_file = Path(best_path)
+            print(f"📁 Found recently modified file: {self.generated_file}")
+            return True
         
         # List all files for debugging
-        all_files = list(current_dir.glob("*"))
-        print(f"📂 All files in directory: {[f.name for f in all_files]}")
+        if debug:
+            print(f"📂 All files in directory: {names}")
         
         print("❌ Could not find generated file")
         return False
@@ -198,7 +266,7 @@ class GooseAutomator:
             
             # Try to get some output
             try:
-                stdout, stderr = file_process.communicate(timeout=5)
+                stdout, stderr = self._communicate(file_process, timeout=5)
                 if stdout:
                     print("📤 File output:")
                     print(stdout)
@@ -223,18 +291,43 @@ class GooseAutomator:
             print(f"❌ Failed to execute file: {e}")
             return False
     
+    def _communicate(self, proc, timeout):
+        """communicate() with proc, draining Goose's output while it waits"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return proc.communicate(timeout=max(min(deadline - time.monotonic(), 0.5), 0))
+            except subprocess.TimeoutExpired:
+                self.drain_pending()
+                if time.monotonic() >= deadline:
+                    raise
+    
+    def _wait_for_exit(self, timeout):
+        """Wait up to timeout seconds for Goose to exit, echoing its output meanwhile"""
+        deadline = time.monotonic() + timeout
+        while self.process.poll() is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if self.output_closed:
+                try:
+                    self.process.wait(timeout=remaining)
+                except subprocess.TimeoutExpired:
+                    pass
+                return
+            self._drain(remaining)
+    
     def cleanup(self):
         """Clean up the Goose session"""
-        self.monitoring = False
-        
         if self.process:
             print("🧹 Cleaning up Goose session...")
             try:
                 # Try to send exit command gracefully
                 if self.process.poll() is None:
+                    self.drain_pending()
                     self.process.stdin.write("exit\n")
                     self.process.stdin.flush()
-                    time.sleep(2)
+                    self._wait_for_exit(2)
                 
                 # Force terminate if still running
                 if self.process.poll() is None:
@@ -264,18 +357,16 @@ class GooseAutomator:
             if not self.send_prompt(prompt):
                 return False, None
             
-            # Step 3: Wait a bit more and find the file
-            print("⏳ Giving Goose more time to finish...")
-            time.sleep(10)
-            
+            # Step 3: Find the file
             if not self.find_generated_file(file_patterns):
                 print("⚠️ Could not find generated file automatically")
                 
                 # Try to send another command to goose to finish
                 print("🔄 Trying to complete the task...")
+                self.expect_response()
                 self.process.stdin.write("\n")  # Send enter
                 self.process.stdin.flush()
-                time.sleep(10)
+                self.wait_for_response(max_wait=30, idle_threshold=10)
                 
                 # Try finding the file again
                 if not self.find_generated_file(file_patterns):